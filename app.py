@@ -2,136 +2,565 @@
 # Deskripsi: Aplikasi web Flask untuk watermarking dokumen .docx dengan QR Code LSB.
 
 import os
-import subprocess
-import uuid
+import re
+import secrets
 import shutil
 import json
 import csv
 import io
+import traceback
+import queue
+import threading
+import socket
+import sys
+import time
+import multiprocessing
+import importlib.util
 from datetime import datetime, timedelta
-from flask import Flask, render_template, request, jsonify, send_from_directory, Response
-from PIL import Image
+from operator import itemgetter
+from urllib.parse import unquote
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+try:
+    import fcntl  # Tidak tersedia di Windows
+except ImportError:
+    fcntl = None
+try:
+    import orjson  # Opsional: serializer JSON berbasis C untuk respons besar
+except ImportError:
+    orjson = None
+try:
+    from waitress import serve as waitress_serve  # Opsional: server WSGI produksi lintas platform (termasuk Windows)
+except ImportError:
+    waitress_serve = None
+try:
+    from flask_compress import Compress  # Opsional: kompresi brotli/gzip untuk respons JSON
+except ImportError:
+    Compress = None
+from flask import Flask, render_template, request, jsonify, send_from_directory, Response, abort, url_for, g
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.serving import make_server
 import numpy as np
+import cv2
 import fitz  # PyMuPDF
-
-from main import extract_images_from_docx, embed_watermark_to_docx, extract_images_from_pdf, embed_watermark_to_pdf, analyze_qr_options
-from qr_utils import (read_qr, analyze_text_encoding, calculate_qr_capacity, 
+from PIL import Image
+try:
+    from numba import njit, prange  # Opsional: kernel SSE terkompilasi untuk calculate_metrics
+except ImportError:
+    njit = None
+
+import main as main_module
+from lsb_kernels import _serialize_on_workqueue
+from main import (embed_watermark_to_docx, embed_watermark_to_pdf,
+                  extract_watermark_from_docx, extract_watermark_from_pdf, analyze_qr_options)
+from qr_utils import (read_qr, read_qr_from_image, analyze_text_encoding, calculate_qr_capacity, 
                       get_optimal_qr_version, compare_qr_configurations, generate_qr_advanced,
                       generate_secure_qr, read_secure_qr, validate_qr_security)
 
 # Import security utilities
 import security_utils
 
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider Flask berbasis orjson untuk respons besar (processed_images, log).
+
+    Tipe yang tidak dikenal orjson (mis. datetime, yang oleh Flask diformat sebagai HTTP date)
+    tetap diteruskan ke default() bawaan Flask sehingga formatnya sama.
+
+    Perubahan API: float non-finite (NaN, inf) ditulis sebagai null, bukan NaN/Infinity seperti
+    encoder bawaan Flask. Contohnya PSNR gambar identik (tak hingga) menjadi "psnr": null; frontend
+    menampilkannya sebagai N/A (JSON.parse di browser memang menolak Infinity).
+    """
+
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 # Inisialisasi aplikasi Flask
 app = Flask(__name__)
+if orjson is not None:
+    app.json = OrjsonProvider(app)
 
 # Konfigurasi path
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
-UPLOAD_FOLDER = os.path.join(BASE_DIR, 'static', 'uploads')
+
+
+def _select_upload_folder():
+    """Pilih folder staging unggahan: static/uploads, atau folder dari variabel lingkungan STENO_UPLOAD_FOLDER.
+
+    tmpfs (mis. STENO_UPLOAD_FOLDER=/dev/shm/steno_uploads) membuat baca-ulang dokumen dilayani dari RAM,
+    tetapi sengaja opt-in: /dev/shm bawaan Docker hanya 64MB, sehingga beberapa unggahan 16MB
+    sekaligus bisa gagal dengan ENOSPC.
+    """
+    return os.environ.get('STENO_UPLOAD_FOLDER') or os.path.join(BASE_DIR, 'static', 'uploads')
+
+
+UPLOAD_FOLDER = _select_upload_folder()
 GENERATED_FOLDER = os.path.join(BASE_DIR, 'static', 'generated')
 DOCUMENTS_FOLDER = os.path.join(BASE_DIR, 'public', 'documents')
-MAIN_SCRIPT_PATH = os.path.join(BASE_DIR, 'main.py')
+JOBS_FOLDER = os.path.join(UPLOAD_FOLDER, 'jobs')
 
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(GENERATED_FOLDER, exist_ok=True)
 os.makedirs(DOCUMENTS_FOLDER, exist_ok=True)
+os.makedirs(JOBS_FOLDER, exist_ok=True)
 
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['GENERATED_FOLDER'] = GENERATED_FOLDER
 app.config['DOCUMENTS_FOLDER'] = DOCUMENTS_FOLDER
+app.config['JOBS_FOLDER'] = JOBS_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # Batas unggah 16MB
+# Buffer salin unggahan 1 MiB (default Werkzeug 16 KB) agar dokumen multi-MB ditulis dengan lebih sedikit syscall
+UPLOAD_BUFFER_SIZE = 1 << 20
+
+# Di belakang reverse proxy (nginx/Apache) set STENO_USE_X_SENDFILE=1 agar file unduhan dikirim
+# oleh proxy lewat header X-Sendfile, bukan dialirkan melalui worker Python
+app.config['USE_X_SENDFILE'] = os.environ.get('STENO_USE_X_SENDFILE', '0') == '1'
+
+# Kompresi respons (log embed dan processed_images bisa berukuran beberapa KB).
+# Brotli level 4: rasio mendekati level tinggi dengan biaya CPU yang jauh lebih kecil dari level 11.
+if Compress is not None:
+    app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+    app.config['COMPRESS_MIN_SIZE'] = 512
+    app.config['COMPRESS_BR_LEVEL'] = 4
+    Compress(app)
+
+# Cache browser untuk file unduhan (detik). Nama file berisi ID acak per request dan tidak pernah
+# ditimpa, jadi aman di-cache setahun sebagai immutable; permintaan ulang dijawab 304 lewat ETag
+DOWNLOAD_MAX_AGE = 31536000
+
+# Allowlist nama file unduhan: nama yang tidak cocok ditolak sebelum menyentuh filesystem
+_SAFE_NAME = re.compile(r'^[A-Za-z0-9_.-]{1,128}\.(docx|pdf|png)$')
+
+# Thread pool bersama untuk pekerjaan independen dalam satu request (metrik, salin file, baca QR).
+# NumPy, zlib, dan I/O file melepas GIL sehingga pekerjaan ini benar-benar tumpang tindih.
+_request_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='steno-worker')
+
+# Job embed asinkron (opt-in lewat field async_job=true): dikoordinasi thread pool, pekerjaan
+# beratnya di process pool. Status dan hasil job disimpan sebagai satu file JSON per job di
+# UPLOAD_FOLDER/jobs, sehingga polling /job/<id> bisa dijawab worker gunicorn mana pun.
+JOB_TTL_SECONDS = 3600
+# Ukuran process pool job per proses server. Tiap worker gunicorn punya pool sendiri, jadi launcher
+# mengisi STENO_JOB_PROCESSES agar total proses embed di host tidak melebihi jumlah CPU
+JOB_PROCESSES = max(1, int(os.environ.get('STENO_JOB_PROCESSES') or os.cpu_count() or 1))
+_job_pool = ThreadPoolExecutor(max_workers=JOB_PROCESSES, thread_name_prefix='steno-job')
+_JOB_ID = re.compile(r'^[A-Za-z0-9_-]{16}$')
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def _get_process_pool():
+    """Process pool dibuat saat pertama dipakai; 'spawn' aman dari server multi-thread."""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=JOB_PROCESSES,
+                                                mp_context=multiprocessing.get_context('spawn'))
+        return _process_pool
+
+
+def _run_in_process_pool(func, *args, **kwargs):
+    """Seperti run_in_process, tetapi dijalankan di process pool (menunggu hasilnya)."""
+    global _process_pool
+    pool = _get_process_pool()
+    try:
+        return pool.submit(run_in_process, func, *args, **kwargs).result()
+    except BrokenProcessPool:
+        # Proses pool mati (mis. OOM killer): job ini gagal, job berikutnya memakai pool baru
+        with _process_pool_lock:
+            if _process_pool is pool:
+                _process_pool = None
+        raise
+
+
+def _job_path(job_id):
+    return os.path.join(app.config['JOBS_FOLDER'], f"{job_id}.json")
+
+
+def _write_job(job_id, record):
+    """Tulis status job secara atomik (file sementara lalu os.replace)."""
+    path = _job_path(job_id)
+    temp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(app.json.dumps(record))
+    os.replace(temp_path, path)
+
+
+def _run_job(job_id, func, *args):
+    """Jalankan func(*args) -> (payload, status) dan simpan hasilnya ke file job."""
+    try:
+        payload, status = func(*args)
+        record = {"status": "done", "payload": payload, "http_status": status}
+    except Exception as e:
+        print(f"[!] Job {job_id} gagal: {e}")
+        record = {"status": "failed", "message": str(e)}
+    _write_job(job_id, record)
+
+
+def _submit_job(func, *args):
+    """Jadwalkan func(*args) di job pool dan kembalikan job_id-nya."""
+    # Buang file job yang sudah kedaluwarsa agar folder jobs tidak tumbuh tanpa batas
+    expired_before = time.time() - JOB_TTL_SECONDS
+    with os.scandir(app.config['JOBS_FOLDER']) as it:
+        for entry in it:
+            try:
+                if entry.stat().st_mtime < expired_before:
+                    os.unlink(entry.path)
+            except FileNotFoundError:
+                pass
+
+    job_id = secrets.token_urlsafe(12)
+    # PID pemilik dan waktu mulai dicatat agar job yang prosesnya mati dilaporkan gagal
+    _write_job(job_id, {"status": "running", "pid": os.getpid(), "started": time.time()})
+    _job_pool.submit(_run_job, job_id, func, *args)
+    return job_id
+
+
+def _job_owner_alive(pid):
+    """Apakah proses yang menjalankan job masih hidup."""
+    if pid is None or pid == os.getpid():
+        return True
+    if os.name == 'nt':
+        return True  # os.kill(pid, 0) di Windows menghentikan proses; tanpa gunicorn hanya ada satu proses
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # Proses ada, milik user lain
+    return True
+
 
 ALLOWED_DOCX_EXTENSIONS = {'docx'}
 ALLOWED_PDF_EXTENSIONS = {'pdf'}
 ALLOWED_IMAGE_EXTENSIONS = {'png'}
+ALLOWED_DOCUMENT_EXTENSIONS = ALLOWED_DOCX_EXTENSIONS | ALLOWED_PDF_EXTENSIONS
+
+
+def _file_ext(filename):
+    """Ekstensi file tanpa titik, huruf kecil ('' jika tidak ada); satu rfind tanpa alokasi list."""
+    dot = filename.rfind('.')
+    return filename[dot + 1:].lower() if dot >= 0 else ''
 
 
 def allowed_file(filename, allowed_extensions):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in allowed_extensions
+    return _file_ext(filename) in allowed_extensions
+
+
+class _ThreadLocalStream:
+    """Proxy sys.stdout/sys.stderr yang menulis ke buffer milik thread saat ini, atau ke stream asli.
+
+    run_in_process dipanggil dari handler request yang berjalan paralel, jadi output tiap pipeline
+    harus ditangkap per thread; contextlib.redirect_stdout mengganti sys.stdout untuk seluruh proses.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+
+    def _target(self):
+        return getattr(self._local, 'buffer', None) or self._stream
+
+    def capture(self, buffer):
+        """Arahkan output thread ini ke buffer; kembalikan buffer sebelumnya untuk dipulihkan."""
+        previous = getattr(self._local, 'buffer', None)
+        self._local.buffer = buffer
+        return previous
+
+    def release(self, previous):
+        self._local.buffer = previous
+
+    def write(self, text):
+        return self._target().write(text)
+
+    def flush(self):
+        self._target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+# Dipasang sekali saat import; thread yang tidak sedang menangkap output tetap menulis ke stream asli
+if not isinstance(sys.stdout, _ThreadLocalStream):
+    sys.stdout = _ThreadLocalStream(sys.stdout)
+if not isinstance(sys.stderr, _ThreadLocalStream):
+    sys.stderr = _ThreadLocalStream(sys.stderr)
+_stdout_proxy = sys.stdout
+_stderr_proxy = sys.stderr
 
 
 def run_main_script(args):
-    """Menjalankan skrip main.py dan menangkap output."""
-    command = ['python', MAIN_SCRIPT_PATH] + args
+    """Menjalankan perintah CLI main.py (mis. ['generate_qr', '--data', ...]) di proses ini dan menangkap output.
+
+    Argumen diparse dengan parser main.py lalu diteruskan ke tabel dispatch main.COMMAND_HANDLERS,
+    sehingga tidak ada subprocess dan interpreter Python baru per request.
+    """
+    print(f"[*] Menjalankan perintah: main.py {' '.join(args)}")
+    return run_in_process(main_module.main, args)
+
+
+def run_in_process(func, *args, **kwargs):
+    """Menjalankan fungsi pipeline dari main.py di proses ini sambil menangkap output print-nya.
+
+    Menggantikan pemanggilan `python main.py ...` lewat subprocess untuk embed/extract:
+    tidak ada fork dan start-up interpreter, dan nilai kembalian fungsi bisa langsung dipakai.
+
+    Args:
+        func (callable): Fungsi yang dijalankan (mis. embed_watermark_to_docx).
+        *args: Argumen posisi untuk func.
+        **kwargs: Argumen keyword untuk func.
+
+    Returns:
+        dict: Kontrak yang sama dengan run_main_script ("success", "stdout", "stderr"[, "error"])
+              ditambah "value" berisi nilai kembalian func.
+    """
+    stdout_buffer = io.StringIO()
+    stderr_buffer = io.StringIO()
     try:
-        print(f"[*] Menjalankan perintah: {' '.join(command)}")
-        result = subprocess.run(command, capture_output=True, text=True, check=True, encoding='utf-8')
-        print(f"[*] Stdout: {result.stdout}")
-        print(f"[*] Stderr: {result.stderr}")
-        return {"success": True, "stdout": result.stdout, "stderr": result.stderr}
-    except subprocess.CalledProcessError as e:
-        print(f"[!] Error saat menjalankan skrip: {e}")
-        print(f"    Stdout: {e.stdout}")
-        print(f"    Stderr: {e.stderr}")
-        return {"success": False, "stdout": e.stdout, "stderr": e.stderr, "error": str(e)}
-    except FileNotFoundError:
-        error_msg = "[!] Error: Perintah 'python' atau skrip 'main.py' tidak ditemukan. Pastikan Python terinstal dan path sudah benar."
-        print(error_msg)
-        return {"success": False, "stdout": "", "stderr": error_msg, "error": error_msg}
+        previous_stdout = _stdout_proxy.capture(stdout_buffer)
+        previous_stderr = _stderr_proxy.capture(stderr_buffer)
+        try:
+            value = func(*args, **kwargs)
+        finally:
+            _stdout_proxy.release(previous_stdout)
+            _stderr_proxy.release(previous_stderr)
+    except SystemExit as e:
+        # argparse / sys.exit() dari main.py: kode selain 0 berarti gagal, seperti exit code subprocess
+        if e.code not in (None, 0):
+            error_msg = f"Perintah berhenti dengan kode {e.code}"
+            print(f"[!] Error saat menjalankan {func.__name__}: {error_msg}")
+            return {"success": False, "stdout": stdout_buffer.getvalue(), "stderr": stderr_buffer.getvalue(),
+                    "error": error_msg, "value": None}
+        value = None
     except Exception as e:
-        error_msg = f"[!] Exception saat menjalankan skrip: {str(e)}"
-        print(error_msg)
-        return {"success": False, "stdout": "", "stderr": error_msg, "error": error_msg}
+        # Traceback ikut disimpan agar penanda seperti NO_IMAGES_FOUND tetap terdeteksi di stderr
+        stderr_buffer.write(traceback.format_exc())
+        print(f"[!] Error saat menjalankan {func.__name__}: {e}")
+        return {"success": False, "stdout": stdout_buffer.getvalue(), "stderr": stderr_buffer.getvalue(),
+                "error": str(e), "value": None}
+
+    print(f"[*] Stdout: {stdout_buffer.getvalue()}")
+    if stderr_buffer.getvalue():
+        print(f"[*] Stderr: {stderr_buffer.getvalue()}")
+    return {"success": True, "stdout": stdout_buffer.getvalue(), "stderr": stderr_buffer.getvalue(), "value": value}
+
+
+def _unlink(path):
+    """Hapus file jika ada (EAFP: satu syscall unlink tanpa cek exists terlebih dahulu)."""
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+# Antrian penghapusan file sementara: unlink dikerjakan thread latar agar respons tidak menunggu
+_cleanup_queue = queue.SimpleQueue()
+
+
+def _cleanup_worker():
+    while True:
+        path = _cleanup_queue.get()
+        # FileNotFoundError wajar (file sudah hilang); error lain tidak boleh menghentikan thread ini
+        try:
+            _unlink(path)
+        except OSError as e:
+            print(f"[!] Warning: Gagal menghapus file sementara {path}: {e}")
+
+
+threading.Thread(target=_cleanup_worker, name='steno-cleanup', daemon=True).start()
 
 
-def calculate_metrics(original_docx_path, stego_docx_path):
-    """Menghitung MSE dan PSNR antara gambar-gambar dalam dua file .docx."""
+def _schedule_removal(path):
+    """Jadwalkan penghapusan file sementara di thread latar (tidak memblokir respons)."""
+    _cleanup_queue.put(path)
 
+
+def _register_temp_files(*paths):
+    """Daftarkan file sementara milik request ini; dihapus otomatis saat request selesai."""
+    g.setdefault('temp_files', []).extend(paths)
+
+
+def _release_temp_files():
+    """Ambil alih file sementara request ini (mis. untuk job async) agar tidak dihapus saat teardown."""
+    return g.pop('temp_files', [])
+
+
+@app.teardown_request
+def _remove_request_temp_files(exc):
+    # Berjalan di semua jalur keluar request: sukses, return awal karena error, maupun exception
+    for path in g.pop('temp_files', ()):
+        _schedule_removal(path)
+
+
+def _run_then_remove(paths, func, *args):
+    """Jalankan func(*args) lalu jadwalkan penghapusan paths, apa pun hasilnya."""
     try:
-        # Ekstrak gambar dari kedua dokumen
-        original_images_dir = os.path.join(app.config['GENERATED_FOLDER'], "original_images")
-        stego_images_dir = os.path.join(app.config['GENERATED_FOLDER'], "stego_images")
-        os.makedirs(original_images_dir, exist_ok=True)
-        os.makedirs(stego_images_dir, exist_ok=True)
+        return func(*args)
+    finally:
+        for path in paths:
+            _schedule_removal(path)
+
+
+# ioctl FICLONE dari <linux/fs.h>: reflink (copy-on-write) pada Btrfs/XFS
+_FICLONE = 0x40049409
 
-        original_images = extract_images_from_docx(original_docx_path, original_images_dir)
-        stego_images = extract_images_from_docx(stego_docx_path, stego_images_dir)
 
-        if not original_images or not stego_images:
-            print("[!] Tidak dapat membandingkan gambar: Gagal mengekstrak gambar dari dokumen.")
-            return {"mse": None, "psnr": None, "error": "Gagal mengekstrak gambar dari dokumen."}
+def _kernel_copy(copy_func, src_fd, dst_fd, size):
+    """Salin size byte dari src_fd ke dst_fd dengan copy_func(src_fd, dst_fd, count, offset)."""
+    offset = 0
+    while offset < size:
+        copied = copy_func(src_fd, dst_fd, size - offset, offset)
+        if copied == 0:
+            raise OSError("Penyalinan berhenti sebelum file selesai disalin")
+        offset += copied
 
-        if len(original_images) != len(stego_images):
-            print("[!] Tidak dapat membandingkan gambar: Jumlah gambar tidak sama.")
-            return {"mse": None, "psnr": None, "error": "Jumlah gambar tidak sama."}
 
-        total_mse = 0
-        all_psnr_values = []
+def fast_publish(src, dst):
+    """Publikasikan file src ke dst dengan perpindahan data seminimal mungkin.
 
-        for original_image_path, stego_image_path in zip(original_images, stego_images):
+    Urutan percobaan: hardlink -> reflink (FICLONE) -> os.copy_file_range -> os.sendfile -> shutil.copy2.
+    copy_file_range dan sendfile menyalin di sisi kernel tanpa buffer userspace; pada kernel
+    baru copy_file_range juga bisa menjadi reflink di filesystem yang mendukungnya.
+    Aman dipakai untuk dokumen stego karena sumber baru saja ditulis dan tidak diubah lagi.
+
+    Args:
+        src (str): Path file sumber.
+        dst (str): Path tujuan (belum ada).
+
+    Returns:
+        str: Path tujuan.
+    """
+    try:
+        os.link(src, dst)
+        return dst
+    except (OSError, AttributeError):
+        pass
+
+    try:
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
             try:
-                original_image = Image.open(original_image_path).convert('RGB')
-                stego_image = Image.open(stego_image_path).convert('RGB')
+                if fcntl is None:
+                    raise OSError("FICLONE tidak didukung")
+                fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+            except OSError:
+                size = os.fstat(fsrc.fileno()).st_size
+                try:
+                    _kernel_copy(os.copy_file_range, fsrc.fileno(), fdst.fileno(), size)
+                except (OSError, AttributeError):
+                    # copy_file_range tidak tersedia (Python < 3.8, non-Linux) atau ditolak (lintas fs lama)
+                    fdst.seek(0)
+                    fdst.truncate()
+                    _kernel_copy(lambda src_fd, dst_fd, count, offset: os.sendfile(dst_fd, src_fd, offset, count),
+                                 fsrc.fileno(), fdst.fileno(), size)
+        shutil.copystat(src, dst)
+        return dst
+    except (OSError, AttributeError):
+        pass
+
+    shutil.copy2(src, dst)
+    return dst
+
 
-                if original_image.size != stego_image.size:
+# 10 * log10(255 ** 2), suku konstan rumus PSNR untuk piksel 8-bit
+PSNR_MAX_TERM = 48.13080360867911
+
+
+def _sse_u8_numpy(a, b):
+    """Jumlah kuadrat selisih (SSE) dua array uint8 1-D berukuran sama, versi NumPy."""
+    # Selisih dalam int16 (cukup untuk -255..255); einsum menjumlahkan kuadratnya langsung
+    # ke akumulator int64 tanpa membuat array kuadrat maupun salinan float64 seukuran gambar
+    diff = np.subtract(a, b, dtype=np.int16)
+    return int(np.einsum('i,i->', diff, diff, dtype=np.int64))
+
+
+if njit is not None:
+    # Signature eager: kernel dikompilasi saat import (dan di-cache ke disk), sehingga
+    # request pertama tidak menanggung biaya JIT
+    @njit('int64(uint8[::1], uint8[::1])', cache=True, parallel=True, fastmath=True)
+    def _sse_u8(a, b):
+        s = 0
+        for i in prange(a.size):
+            d = np.int64(a[i]) - np.int64(b[i])
+            s += d * d
+        return s
+
+    # Dipanggil dari request metrik yang bersamaan: pada threading layer workqueue diserialkan
+    # dengan lock yang sama seperti kernel LSB (lihat lsb_kernels)
+    _sse_u8 = _serialize_on_workqueue(_sse_u8)
+else:
+    _sse_u8 = _sse_u8_numpy
+
+
+def calculate_metrics(image_pairs):
+    """Menghitung MSE dan PSNR untuk pasangan gambar asli dan gambar ber-watermark.
+
+    Pasangan diambil langsung dari hasil pipeline embed (processed_images), jadi gambar tidak
+    perlu diekstrak ulang dari dokumen asli maupun dokumen stego.
+
+    Args:
+        image_pairs (list[tuple[str, str]]): Daftar (path gambar asli, path gambar stego).
+
+    Returns:
+        dict: {"mse", "psnr"[, "error"]}
+    """
+
+    try:
+        if not image_pairs:
+            print("[!] Tidak dapat membandingkan gambar: Tidak ada pasangan gambar yang diproses.")
+            return {"mse": None, "psnr": None, "error": "Tidak ada pasangan gambar yang diproses."}
+
+        # Per pasangan cukup dikumpulkan jumlah kuadrat galat (SSE) dan jumlah elemen ke array
+        # yang dialokasikan di depan; MSE dan PSNR semua pasangan dihitung sekaligus setelah loop
+        sse_values = np.empty(len(image_pairs), dtype=np.int64)
+        element_counts = np.empty(len(image_pairs), dtype=np.int64)
+        compared = 0
+
+        for original_image_path, stego_image_path in image_pairs:
+            try:
+                # Ukuran dibandingkan dari header saja (Image.open belum men-decode piksel),
+                # jadi pasangan yang tidak cocok dilewati tanpa decode penuh
+                with Image.open(original_image_path) as original_header, Image.open(stego_image_path) as stego_header:
+                    sizes_match = original_header.size == stego_header.size
+                if not sizes_match:
                     print(f"[!] Ukuran gambar tidak sama: {original_image_path} vs {stego_image_path}")
                     continue  # Lewati pasangan gambar ini
 
-                original_array = np.array(original_image, dtype=np.float64)
-                watermarked_array = np.array(stego_image, dtype=np.float64)
+                # cv2.imread men-decode langsung ke array uint8 kontigu (BGR; urutan kanal tidak
+                # berpengaruh pada MSE karena kedua gambar melewati jalur yang sama)
+                original_array = cv2.imread(original_image_path, cv2.IMREAD_COLOR)
+                watermarked_array = cv2.imread(stego_image_path, cv2.IMREAD_COLOR)
+                if original_array is None or watermarked_array is None:
+                    print(f"[!] Gagal membaca gambar: {original_image_path} / {stego_image_path}")
+                    continue
 
-                mse = np.mean((original_array - watermarked_array) ** 2)
-                total_mse += mse
-
-                if mse == 0:
-                    psnr = float('inf')
-                else:
-                    max_pixel = 255.0
-                    psnr = 20 * np.log10(max_pixel / np.sqrt(mse))
-                all_psnr_values.append(psnr)
+                # Array hasil imread sudah kontigu, jadi ravel() tidak menyalin data
+                sse_values[compared] = _sse_u8(original_array.ravel(), watermarked_array.ravel())
+                element_counts[compared] = original_array.size
+                compared += 1
 
             except Exception as e:
                 print(f"[!] Error memproses pasangan gambar: {e}")
 
-        final_mse = total_mse / len(original_images) if original_images else 0
-        # Rata-rata PSNR (hindari ZeroDivisionError jika daftar kosong)
-        final_psnr = sum(all_psnr_values) / len(all_psnr_values) if all_psnr_values else 0
+        if compared == 0:
+            return {"mse": 0, "psnr": 0}
+
+        # Pasangan yang dilewati tidak ikut dihitung
+        mse_values = sse_values[:compared] / element_counts[:compared]
+        # PSNR = 10*log10(255^2 / MSE) = 10*log10(255^2) - 10*log10(MSE); suku pertama konstan.
+        # Pasangan identik (MSE 0) memiliki PSNR tak hingga
+        with np.errstate(divide='ignore'):
+            psnr_values = np.where(mse_values == 0, np.inf, PSNR_MAX_TERM - 10.0 * np.log10(mse_values))
 
-        # Bersihkan direktori sementara
-        if os.path.exists(original_images_dir):
-            shutil.rmtree(original_images_dir)
-        if os.path.exists(stego_images_dir):
-            shutil.rmtree(stego_images_dir)
+        final_mse = float(mse_values.mean())
+        final_psnr = float(psnr_values.mean())
 
         return {"mse": final_mse, "psnr": final_psnr}
 
@@ -171,7 +600,7 @@ def generate_qr_route():
     if border < 0:
         return jsonify({"success": False, "message": "Border harus non-negatif."}), 400
 
-    qr_filename = f"qr_{uuid.uuid4().hex}.png"
+    qr_filename = f"qr_{secrets.token_urlsafe(8)}.png"
     qr_output_path = os.path.join(app.config['GENERATED_FOLDER'], qr_filename)
 
     # Build command with new parameters
@@ -201,7 +630,7 @@ def generate_qr_route():
         return jsonify({
             "success": True,
             "message": "QR Code berhasil dibuat!",
-            "qr_url": f"/static/generated/{qr_filename}",
+            "qr_url": url_for('static', filename=f"generated/{qr_filename}"),
             "qr_filename": qr_filename,
             "configuration": {
                 "version": version,
@@ -397,7 +826,7 @@ def generate_qr_advanced_route():
             return jsonify({"success": False, "message": "Border harus non-negatif."}), 400
 
         # Generate QR code
-        qr_filename = f"qr_advanced_{uuid.uuid4().hex}.png"
+        qr_filename = f"qr_advanced_{secrets.token_urlsafe(8)}.png"
         qr_output_path = os.path.join(app.config['GENERATED_FOLDER'], qr_filename)
 
         # Use the advanced QR generation function directly
@@ -431,7 +860,7 @@ def generate_qr_advanced_route():
         return jsonify({
             "success": True,
             "message": "QR Code advanced berhasil dibuat!",
-            "qr_url": f"/static/generated/{qr_filename}",
+            "qr_url": url_for('static', filename=f"generated/{qr_filename}"),
             "qr_filename": qr_filename,
             "configuration": {
                 "requested_version": version,
@@ -477,6 +906,9 @@ def embed_document_route():
     validate_security = request.form.get('validate_security', 'false').lower() == 'true'
     if validate_security and not enable_document_security:
         enable_document_security = True
+
+    # Opsional: proses di latar belakang dan kembalikan job_id (default tetap sinkron)
+    async_job = request.form.get('async_job', 'false').lower() == 'true'
     
     # Convert string parameters to appropriate types
     try:
@@ -512,8 +944,9 @@ def embed_document_route():
         return jsonify({"success": False, "message": error_msg}), 400
 
     # Check if it's either DOCX or PDF
-    is_docx = allowed_file(doc_file.filename, ALLOWED_DOCX_EXTENSIONS)
-    is_pdf = allowed_file(doc_file.filename, ALLOWED_PDF_EXTENSIONS)
+    file_extension = _file_ext(doc_file.filename)
+    is_docx = file_extension == 'docx'
+    is_pdf = file_extension == 'pdf'
     
     if not (doc_file and (is_docx or is_pdf)):
         error_msg = "Format Dokumen harus .docx atau .pdf"
@@ -524,13 +957,16 @@ def embed_document_route():
         print(f"[ERROR] /embed_document: {error_msg}")
         return jsonify({"success": False, "message": error_msg}), 400
 
-    # Generate unique filenames based on document type
-    file_extension = '.docx' if is_docx else '.pdf'
-    doc_filename = f"doc_embed_in_{uuid.uuid4().hex}{file_extension}"
-    qr_embed_filename = f"qr_embed_in_{uuid.uuid4().hex}.png"
+    # Generate unique filenames based on document type.
+    # Satu ID per request untuk semua file terkait, sehingga mudah dikorelasikan di log
+    request_id = secrets.token_urlsafe(8)
+    doc_filename = f"doc_embed_in_{request_id}.{file_extension}"
+    qr_embed_filename = f"qr_embed_in_{request_id}.png"
     doc_temp_path = os.path.join(app.config['UPLOAD_FOLDER'], doc_filename)
     qr_temp_path = os.path.join(app.config['UPLOAD_FOLDER'], qr_embed_filename)
-    doc_file.save(doc_temp_path)
+    # File sementara dihapus saat request selesai (teardown), di jalur mana pun request berakhir
+    _register_temp_files(doc_temp_path, qr_temp_path)
+    doc_file.save(doc_temp_path, buffer_size=UPLOAD_BUFFER_SIZE)
     qr_file.save(qr_temp_path)
 
     # Auto-optimization logic
@@ -585,271 +1021,288 @@ def embed_document_route():
             print(f"[!] Auto-optimization failed, using original settings: {e}")
             optimized_qr_config = qr_config.copy()
 
-    stego_doc_filename = f"stego_doc_{uuid.uuid4().hex}{file_extension}"
+    stego_doc_filename = f"stego_doc_{request_id}.{file_extension}"
     stego_doc_output_path = os.path.join(app.config['GENERATED_FOLDER'], stego_doc_filename)
     
     # Juga siapkan path untuk dokumen hasil di folder documents
-    documents_filename = f"watermarked_{uuid.uuid4().hex}{file_extension}"
+    documents_filename = f"watermarked_{request_id}.{file_extension}"
     documents_output_path = os.path.join(app.config['DOCUMENTS_FOLDER'], documents_filename)
 
-    # Choose the appropriate command based on file type
+    # Choose the appropriate embed function based on file type
     if is_docx:
-        args = ['embed_docx', '--docx', doc_temp_path, '--qr', qr_temp_path, '--output', stego_doc_output_path]
+        embed_function = embed_watermark_to_docx
         print("[*] Memulai proses embed_docx")
     else:  # is_pdf
-        args = ['embed_pdf', '--pdf', doc_temp_path, '--qr', qr_temp_path, '--output', stego_doc_output_path]
+        embed_function = embed_watermark_to_pdf
         print("[*] Memulai proses embed_pdf")
-    
-    # Add security parameters if enabled
-    if enable_document_security:
-        if document_key:
-            args.extend(['--security_key', document_key])
-            print(f"[*] Security enabled with provided key")
-        else:
-            print(f"[*] Security enabled, will generate document key")
-    
-    result = run_main_script(args)
 
-    if result["success"]:
-        print("[*] Proses embed_docx berhasil")
-        
-        # Run the appropriate embed function directly to get the processed images
+    # NEW: Security validation variables
+    security_validation_results = None
+    qr_authorization_status = None
+    generated_document_key = None
+
+    # Perform security validation if requested
+    if enable_document_security:
+        print("[*] Performing security validation before embedding...")
         try:
-            print("[*] Mendapatkan informasi gambar yang diproses")
-            
-            # NEW: Security validation variables
-            security_validation_results = None
-            qr_authorization_status = None
-            generated_document_key = None
-            
-            # Perform security validation if requested
-            if enable_document_security:
-                print("[*] Performing security validation before embedding...")
-                try:
-                    # Generate document key if not provided
-                    if not document_key:
-                        generated_document_key = security_utils.generate_document_key(doc_temp_path)
-                        document_key = generated_document_key
-                        print("[*] Document key generated for security validation")
-                    
-                    # Validate QR authorization if requested
-                    if validate_qr_auth:
-                        print("[*] Validating QR authorization...")
-                        qr_data_list = read_qr(qr_temp_path)
-                        if qr_data_list:
-                            qr_data = qr_data_list[0]
-                            document_hash = security_utils.generate_document_hash(doc_temp_path)
-                            
-                            validation_results = validate_qr_security(qr_data, document_key, document_hash)
-                            qr_authorization_status = validation_results
-                            
-                            if not validation_results['overall_valid']:
-                                print("[!] QR authorization validation failed")
-                                # Clean up temp files
-                                if os.path.exists(doc_temp_path):
-                                    os.remove(doc_temp_path)
-                                if os.path.exists(qr_temp_path):
-                                    os.remove(qr_temp_path)
-                                
-                                return jsonify({
-                                    "success": False,
-                                    "message": "QR authorization failed - QR code is not authorized for this document",
-                                    "security_status": "authorization_failed",
-                                    "validation_results": validation_results,
-                                    "security_warnings": ["QR code authorization check failed", "Document embedding blocked for security"]
-                                }), 400
-                            else:
-                                print("[*] QR authorization validation passed")
-                        else:
-                            print("[!] Warning: Could not read QR code for authorization validation")
-                    
-                    # Prepare security metadata
-                    security_validation_results = {
-                        "security_enabled": True,
-                        "document_key_generated": bool(generated_document_key),
-                        "qr_authorization_checked": validate_qr_auth,
-                        "qr_authorization_status": qr_authorization_status,
-                        "document_hash": security_utils.generate_document_hash(doc_temp_path),
-                        "encryption_applied": True
-                    }
-                        
-                except Exception as security_e:
-                    print(f"[!] Security validation error: {security_e}")
-                    # Clean up temp files
-                    if os.path.exists(doc_temp_path):
-                        os.remove(doc_temp_path)
-                    if os.path.exists(qr_temp_path):
-                        os.remove(qr_temp_path)
-                    
-                    return jsonify({
-                        "success": False,
-                        "message": f"Security validation failed: {str(security_e)}",
-                        "security_status": "validation_error",
-                        "security_error": str(security_e)
-                    }), 500
-            
-            # Call embedding functions with security parameters
-            if is_docx:
-                process_result = embed_watermark_to_docx(
-                    doc_temp_path, qr_temp_path, stego_doc_output_path,
-                    validate_security=enable_document_security,
-                    document_key=document_key
-                )
-            else:  # is_pdf
-                process_result = embed_watermark_to_pdf(
-                    doc_temp_path, qr_temp_path, stego_doc_output_path,
-                    validate_security=enable_document_security,
-                    document_key=document_key
-                )
-            
+            # Generate document key if not provided
+            if not document_key:
+                generated_document_key = security_utils.generate_document_key(doc_temp_path)
+                document_key = generated_document_key
+                print("[*] Document key generated for security validation")
+
+            # Validate QR authorization if requested
+            if validate_qr_auth:
+                print("[*] Validating QR authorization...")
+                qr_data_list = read_qr(qr_temp_path)
+                if qr_data_list:
+                    qr_data = qr_data_list[0]
+                    document_hash = security_utils.generate_document_hash(doc_temp_path)
+
+                    validation_results = validate_qr_security(qr_data, document_key, document_hash)
+                    qr_authorization_status = validation_results
+
+                    if not validation_results['overall_valid']:
+                        print("[!] QR authorization validation failed")
+                        return jsonify({
+                            "success": False,
+                            "message": "QR authorization failed - QR code is not authorized for this document",
+                            "security_status": "authorization_failed",
+                            "validation_results": validation_results,
+                            "security_warnings": ["QR code authorization check failed", "Document embedding blocked for security"]
+                        }), 400
+                    else:
+                        print("[*] QR authorization validation passed")
+                else:
+                    print("[!] Warning: Could not read QR code for authorization validation")
+
+            # Prepare security metadata
+            security_validation_results = {
+                "security_enabled": True,
+                "document_key_generated": bool(generated_document_key),
+                "qr_authorization_checked": validate_qr_auth,
+                "qr_authorization_status": qr_authorization_status,
+                "document_hash": security_utils.generate_document_hash(doc_temp_path),
+                "encryption_applied": True
+            }
+
+        except Exception as security_e:
+            print(f"[!] Security validation error: {security_e}")
+            return jsonify({
+                "success": False,
+                "message": f"Security validation failed: {str(security_e)}",
+                "security_status": "validation_error",
+                "security_error": str(security_e)
+            }), 500
+
+    # URL dibangun di sini selagi request context masih aktif (job async berjalan di luar request)
+    download_url = url_for('download_generated', filename=stego_doc_filename)
+    documents_url = url_for('download_documents', filename=documents_filename)
+
+    def finish_embed(run_embed):
+        """Jalankan embed + metrik + publikasi; mengembalikan (payload, status HTTP)."""
+        result = run_embed(
+            embed_function, doc_temp_path, qr_temp_path, stego_doc_output_path,
+            validate_security=enable_document_security,
+            document_key=document_key
+        )
+
+        if result["success"]:
+            process_result = result["value"]
+            # Pipeline selesai tanpa exception tetapi bisa melaporkan gagal ({"success": False, "error": ...});
+            # dokumen stego tidak ditulis, jadi jangan kembalikan URL unduhan
+            if isinstance(process_result, dict) and not process_result.get("success"):
+                error_msg = process_result.get("error") or "Tidak ada gambar yang berhasil disisipi watermark."
+                print(f"[!] Proses embed_{'docx' if is_docx else 'pdf'} gagal: {error_msg}")
+                return {
+                    "success": False,
+                    "message": f"Gagal menyisipkan watermark: {error_msg}",
+                    "error": error_msg,
+                    "log": result["stdout"]
+                }, 500
+
+            print(f"[*] Proses embed_{'docx' if is_docx else 'pdf'} berhasil")
+
             # Get processed images info if available
             processed_images = []
             qr_image_url = ""
             public_dir = ""
             qr_info = None
-            
-            if isinstance(process_result, dict) and process_result.get("success"):
+
+            if isinstance(process_result, dict):
                 processed_images = process_result.get("processed_images", [])
                 qr_image_url = process_result.get("qr_image", "")
                 public_dir = process_result.get("public_dir", "")
                 qr_info = process_result.get("qr_info", None)
                 print(f"[*] ✅ SUCCESS: Mendapatkan {len(processed_images)} gambar yang diproses")
                 print(f"[*] 📊 Processed images data: {processed_images}")
-                
+
                 # Ensure proper path format for frontend with detailed logging
                 for i, img in enumerate(processed_images):
                     print(f"[*] 🔍 Image {i} - Original: {img.get('original')}, Watermarked: {img.get('watermarked')}")
             else:
                 print("[!] Tidak mendapatkan detail gambar yang diproses")
-        except ValueError as ve:
-            if str(ve) == "NO_IMAGES_FOUND":
-                # Handle no images case
-                return jsonify({
-                    "success": False,
-                    "message": "Dokumen ini tidak mengandung gambar",
-                    "log": result["stderr"],
-                    "error_type": "NO_IMAGES_FOUND"
-                }), 400
-            print(f"[!] Error saat mendapatkan informasi gambar: {str(ve)}")
-            processed_images = []
-            qr_image_url = ""
-            public_dir = ""
-            qr_info = None
-        except Exception as e:
-            print(f"[!] Error saat mendapatkan informasi gambar: {str(e)}")
-            processed_images = []
-            qr_image_url = ""
-            public_dir = ""
-            qr_info = None
-        
-        # Hitung MSE dan PSNR (only for DOCX, PDF comparison is more complex)
-        if is_docx:
-            metrics = calculate_metrics(doc_temp_path, stego_doc_output_path)
-        else:
-            # For PDF, we skip MSE/PSNR calculation as it's more complex
-            metrics = {"mse": None, "psnr": None, "info": "PDF metrics calculation not implemented"}
-        print(f"[*] Metrik MSE: {metrics['mse']}, PSNR: {metrics['psnr']}")
 
-        # Salin dokumen hasil ke folder documents untuk akses permanen
-        try:
-            shutil.copy2(stego_doc_output_path, documents_output_path)
-            print(f"[*] Dokumen hasil disalin ke: {documents_output_path}")
-        except Exception as e:
-            print(f"[!] Warning: Gagal menyalin dokumen ke folder documents: {str(e)}")
+            # Perhitungan metrik, penyalinan dokumen, dan pembacaan QR saling independen,
+            # jadi dijalankan bersamaan di thread pool lalu ditunggu sebelum menyusun respons
+            # Pasangan gambar asli/stego sudah ditulis pipeline embed ke folder processed_*
+            output_dir = os.path.dirname(stego_doc_output_path)
+            image_pairs = [(os.path.join(output_dir, img['original']), os.path.join(output_dir, img['watermarked']))
+                           for img in processed_images]
+            metrics_future = None
+            if image_pairs:
+                metrics_future = _request_pool.submit(calculate_metrics, image_pairs)
+            copy_future = _request_pool.submit(fast_publish, stego_doc_output_path, documents_output_path)
+            # QR sudah dimuat oleh pipeline embed; decode langsung dari memori bila tersedia
+            qr_pil = process_result.get("qr_pil") if isinstance(process_result, dict) else None
+            if qr_pil is not None:
+                qr_future = _request_pool.submit(read_qr_from_image, qr_pil)
+            else:
+                qr_future = _request_pool.submit(read_qr, qr_temp_path)
 
-        # Baca data QR code untuk ditampilkan
-        qr_data = None
-        try:
-            qr_data_list = read_qr(qr_temp_path)
-            if qr_data_list:
-                qr_data = qr_data_list[0]  # Ambil data QR pertama
-                print(f"[*] Data QR Code: {qr_data}")
-        except Exception as e:
-            print(f"[!] Warning: Tidak dapat membaca data QR Code: {str(e)}")
+            # Hitung MSE dan PSNR (DOCX maupun PDF, dari pasangan gambar hasil embed)
+            if metrics_future is not None:
+                metrics = metrics_future.result()
+            else:
+                metrics = {"mse": None, "psnr": None, "info": "Tidak ada gambar yang berhasil diproses"}
+            print(f"[*] Metrik MSE: {metrics['mse']}, PSNR: {metrics['psnr']}")
 
-        # Hapus file temporary setelah perhitungan metrik
-        if os.path.exists(doc_temp_path):
-            os.remove(doc_temp_path)
-        if os.path.exists(qr_temp_path):
-            os.remove(qr_temp_path)
+            # Salin dokumen hasil ke folder documents untuk akses permanen
+            try:
+                copy_future.result()
+                print(f"[*] Dokumen hasil disalin ke: {documents_output_path}")
+            except Exception as e:
+                print(f"[!] Warning: Gagal menyalin dokumen ke folder documents: {str(e)}")
 
-        # Enhanced logging before sending response
-        print(f"[*] 📤 SENDING RESPONSE:")
-        print(f"[*] 📊 processed_images count: {len(processed_images)}")
-        print(f"[*] 🔍 processed_images content: {processed_images}")
+            # Baca data QR code untuk ditampilkan
+            qr_data = None
+            try:
+                qr_data_list = qr_future.result()
+                if qr_data_list:
+                    qr_data = qr_data_list[0]  # Ambil data QR pertama
+                    print(f"[*] Data QR Code: {qr_data}")
+            except Exception as e:
+                print(f"[!] Warning: Tidak dapat membaca data QR Code: {str(e)}")
+
+            # Enhanced logging before sending response
+            print(f"[*] 📤 SENDING RESPONSE:")
+            print(f"[*] 📊 processed_images count: {len(processed_images)}")
+            print(f"[*] 🔍 processed_images content: {processed_images}")
+        
+            return {
+                "success": True,
+                "message": f"Watermark berhasil disisipkan ke {'dokumen' if is_docx else 'PDF'}!",
+                "download_url": download_url,
+                "documents_url": documents_url,
+                "documents_filename": documents_filename,
+                "log": result["stdout"],
+                "mse": metrics["mse"],
+                "psnr": metrics["psnr"],
+                "processed_images": processed_images,
+                "qr_image": qr_image_url,
+                "public_dir": public_dir,
+                "qr_info": qr_info,
+                "qr_data": qr_data,
+                "document_type": "docx" if is_docx else "pdf",
+                "qr_config": {
+                    "original": qr_config,
+                    "optimized": optimized_qr_config,
+                    "auto_optimization_applied": auto_optimize and (optimized_qr_config != qr_config)
+                },
+                # NEW: Security information
+                "security_validation": security_validation_results,
+                "security_enabled": enable_document_security,
+                "document_key": document_key if enable_document_security else None,
+                "document_key_generated": bool(generated_document_key),
+                "qr_authorization_checked": validate_qr_auth,
+                "security_status": get_embed_security_status(enable_document_security, security_validation_results, qr_authorization_status),
+                "security_warnings": get_embed_security_warnings(enable_document_security, qr_authorization_status),
+                "security_recommendations": get_embed_security_recommendations(enable_document_security, generated_document_key)
+            }, 200
+        else:
+            # Check for the specific "NO_IMAGES_FOUND" error
+            if result["stderr"] and "NO_IMAGES_FOUND" in result["stderr"]:
+                return {
+                    "success": False,
+                    "message": f"{'Dokumen' if is_docx else 'PDF'} ini tidak mengandung gambar",
+                    "log": result["stderr"],
+                    "error_type": "NO_IMAGES_FOUND"
+                }, 400
         
+            return {
+                "success": False,
+                "message": "Gagal menyisipkan watermark.",
+                "log": result["stderr"] or result.get("error", "Error tidak diketahui")
+            }, 500
+
+    if async_job:
+        # Embed berat dijalankan di process pool (lepas dari GIL dan dari redirect stdout
+        # proses ini); klien langsung menerima job_id lalu polling /job/<job_id>
+        # Job mengambil alih file sementara dan menghapusnya sendiri setelah selesai
+        job_id = _submit_job(_run_then_remove, _release_temp_files(), finish_embed, _run_in_process_pool)
         return jsonify({
             "success": True,
-            "message": f"Watermark berhasil disisipkan ke {'dokumen' if is_docx else 'PDF'}!",
-            "download_url": f"/download_generated/{stego_doc_filename}",
-            "documents_url": f"/download_documents/{documents_filename}",
-            "documents_filename": documents_filename,
-            "log": result["stdout"],
-            "mse": metrics["mse"],
-            "psnr": metrics["psnr"],
-            "processed_images": processed_images,
-            "qr_image": qr_image_url,
-            "public_dir": public_dir,
-            "qr_info": qr_info,
-            "qr_data": qr_data,
-            "document_type": "docx" if is_docx else "pdf",
-            "qr_config": {
-                "original": qr_config,
-                "optimized": optimized_qr_config,
-                "auto_optimization_applied": auto_optimize and (optimized_qr_config != qr_config)
-            },
-            # NEW: Security information
-            "security_validation": security_validation_results,
-            "security_enabled": enable_document_security,
-            "document_key": document_key if enable_document_security else None,
-            "document_key_generated": bool(generated_document_key),
-            "qr_authorization_checked": validate_qr_auth,
-            "security_status": get_embed_security_status(enable_document_security, security_validation_results, qr_authorization_status),
-            "security_warnings": get_embed_security_warnings(enable_document_security, qr_authorization_status),
-            "security_recommendations": get_embed_security_recommendations(enable_document_security, generated_document_key)
-        })
-    else:
-        # Hapus file temporary jika terjadi error
-        if os.path.exists(doc_temp_path):
-            os.remove(doc_temp_path)
-        if os.path.exists(qr_temp_path):
-            os.remove(qr_temp_path)
+            "job_id": job_id,
+            "status": "queued",
+            "status_url": url_for('job_status', job_id=job_id)
+        }), 202
 
-        # Check for the specific "NO_IMAGES_FOUND" error
-        if result["stderr"] and "NO_IMAGES_FOUND" in result["stderr"]:
-            return jsonify({
-                "success": False,
-                "message": f"{'Dokumen' if is_docx else 'PDF'} ini tidak mengandung gambar",
-                "log": result["stderr"],
-                "error_type": "NO_IMAGES_FOUND"
-            }), 400
-        
-        return jsonify({
-            "success": False,
-            "message": "Gagal menyisipkan watermark.",
-            "log": result["stderr"] or result.get("error", "Error tidak diketahui")
-        }), 500
+    # Embedding dijalankan sekali, langsung di proses ini (tanpa subprocess main.py)
+    payload, status = finish_embed(run_in_process)
+    return jsonify(payload), status
+
+
+@app.route('/job/<job_id>')
+def job_status(job_id):
+    """Status job embed asinkron; setelah selesai mengembalikan respons embed lengkap."""
+    try:
+        if not _JOB_ID.match(job_id):
+            raise FileNotFoundError(job_id)
+        with open(_job_path(job_id), 'rb') as f:
+            job = app.json.loads(f.read())
+    except FileNotFoundError:
+        return jsonify({"success": False, "message": "Job tidak ditemukan atau sudah kedaluwarsa."}), 404
+
+    if job["status"] == "running":
+        if not _job_owner_alive(job.get("pid")):
+            job = {"status": "failed", "message": "Proses yang menjalankan job berhenti sebelum job selesai."}
+        elif time.time() - job.get("started", time.time()) > JOB_TTL_SECONDS:
+            job = {"status": "failed", "message": "Job melebihi batas waktu."}
+        else:
+            return jsonify({"success": True, "job_id": job_id, "status": "running"}), 202
+    if job["status"] == "failed":
+        return jsonify({"success": False, "job_id": job_id, "status": "failed", "message": job["message"]}), 500
+    return jsonify({**job["payload"], "job_id": job_id, "status": "done"}), job["http_status"]
 
 
 @app.route('/extract_document', methods=['POST'])
 def extract_document_route():
-    if 'docxFileValidate' not in request.files:
-        return jsonify({"success": False, "message": "File Dokumen diperlukan untuk validasi.", "security_status": "missing_document"}), 400
-
-    doc_file = request.files['docxFileValidate']
+    # Unggahan raw body (Content-Type: application/octet-stream, nama file di header X-Filename,
+    # parameter di query string) ditulis langsung dari request.stream ke UPLOAD_FOLDER tanpa
+    # melewati parser multipart dan SpooledTemporaryFile Werkzeug. Form multipart tetap didukung.
+    raw_upload = request.mimetype == 'application/octet-stream'
+    if raw_upload:
+        doc_filename = unquote(request.headers.get('X-Filename', ''))
+        params = request.args
+    else:
+        if 'docxFileValidate' not in request.files:
+            return jsonify({"success": False, "message": "File Dokumen diperlukan untuk validasi.", "security_status": "missing_document"}), 400
+        doc_file = request.files['docxFileValidate']
+        doc_filename = doc_file.filename
+        params = request.form
 
-    if doc_file.filename == '':
+    if doc_filename == '':
         return jsonify({"success": False, "message": "Nama file tidak boleh kosong.", "security_status": "no_file_selected"}), 400
     
     # NEW: Extract security parameters
-    enable_document_security = request.form.get('enable_document_security', 'false').lower() == 'true'
-    security_key = request.form.get('security_key', '').strip()
-    verify_document_auth = request.form.get('verify_document_auth', 'false').lower() == 'true'
-    check_qr_auth = request.form.get('check_qr_auth', 'false').lower() == 'true'
+    enable_document_security = params.get('enable_document_security', 'false').lower() == 'true'
+    security_key = params.get('security_key', '').strip()
+    verify_document_auth = params.get('verify_document_auth', 'false').lower() == 'true'
+    check_qr_auth = params.get('check_qr_auth', 'false').lower() == 'true'
     
     # Legacy parameter for backward compatibility  
-    validate_security = request.form.get('validate_security', 'false').lower() == 'true'
-    document_key = request.form.get('document_key', None)
+    validate_security = params.get('validate_security', 'false').lower() == 'true'
+    document_key = params.get('document_key', None)
     
     # Use legacy parameters if new ones aren't provided
     if validate_security and not enable_document_security:
@@ -858,31 +1311,38 @@ def extract_document_route():
         security_key = document_key
     
     # Check if it's either DOCX or PDF
-    is_docx = allowed_file(doc_file.filename, ALLOWED_DOCX_EXTENSIONS)
-    is_pdf = allowed_file(doc_file.filename, ALLOWED_PDF_EXTENSIONS)
+    file_extension = _file_ext(doc_filename)
+    is_docx = file_extension == 'docx'
+    is_pdf = file_extension == 'pdf'
     
-    if not (doc_file and (is_docx or is_pdf)):
+    if not (is_docx or is_pdf):
         return jsonify({"success": False, "message": "Format Dokumen harus .docx atau .pdf", "security_status": "invalid_file_type"}), 400
 
     # Generate unique filenames based on document type
-    file_extension = '.docx' if is_docx else '.pdf'
-    doc_validate_filename = f"doc_extract_in_{uuid.uuid4().hex}{file_extension}"
+    doc_validate_filename = f"doc_extract_in_{secrets.token_urlsafe(8)}.{file_extension}"
     doc_temp_path = os.path.join(app.config['UPLOAD_FOLDER'], doc_validate_filename)
-    doc_file.save(doc_temp_path)
+    _register_temp_files(doc_temp_path)
+    if raw_upload:
+        # request.stream dibatasi MAX_CONTENT_LENGTH oleh Werkzeug (413 jika terlampaui)
+        with open(doc_temp_path, 'wb') as f:
+            shutil.copyfileobj(request.stream, f, UPLOAD_BUFFER_SIZE)
+    else:
+        doc_file.save(doc_temp_path, buffer_size=UPLOAD_BUFFER_SIZE)
 
-    extraction_id = uuid.uuid4().hex
+    extraction_id = secrets.token_urlsafe(8)
     output_extraction_dir_name = f"extraction_{extraction_id}"
     output_extraction_dir_path = os.path.join(app.config['GENERATED_FOLDER'], output_extraction_dir_name)
 
-    # Choose the appropriate command based on file type
+    # Choose the appropriate extract function based on file type
     if is_docx:
-        args = ['extract_docx', '--docx', doc_temp_path, '--output_dir', output_extraction_dir_path]
+        extract_function = extract_watermark_from_docx
         print("[*] Memulai proses extract_docx")
     else:  # is_pdf
-        args = ['extract_pdf', '--pdf', doc_temp_path, '--output_dir', output_extraction_dir_path]
+        extract_function = extract_watermark_from_pdf
         print("[*] Memulai proses extract_pdf")
-    
-    result = run_main_script(args)
+
+    # Ekstraksi dijalankan langsung di proses ini (tanpa subprocess main.py)
+    result = run_in_process(extract_function, doc_temp_path, output_extraction_dir_path)
 
     if result["success"]:
         extracted_qrs_info = []
@@ -894,129 +1354,127 @@ def extract_document_route():
             "document_integrity_status": "pending"
         }
         
-        if os.path.exists(output_extraction_dir_path) and os.path.isdir(output_extraction_dir_path):
-            # Process extracted QR codes
-            for filename in os.listdir(output_extraction_dir_path):
-                if filename.lower().endswith('.png'):
-                    qr_info = {
-                        "filename": filename,
-                        "url": f"/static/generated/{output_extraction_dir_name}/{filename}"
-                    }
-                    
-                    # NEW: Enhanced security verification for extracted QR
-                    if enable_document_security:
+        # Extractor mengembalikan daftar file QR yang ditulisnya, jadi direktori tidak perlu dipindai ulang
+        extraction_result = result["value"] if isinstance(result["value"], dict) else {}
+        extracted_filenames = [os.path.basename(path) for path in extraction_result.get("extracted_files", [])]
+
+        # Process extracted QR codes
+        for filename in extracted_filenames:
+            qr_info = {
+                "filename": filename,
+                "url": url_for('static', filename=f"generated/{output_extraction_dir_name}/{filename}")
+            }
+
+            # NEW: Enhanced security verification for extracted QR
+            if enable_document_security:
+                try:
+                    qr_file_path = os.path.join(output_extraction_dir_path, filename)
+
+                    # Generate document key if not provided
+                    if not security_key:
+                        doc_key_for_validation = security_utils.generate_document_key(doc_temp_path)
+                        print("[*] Generated document key for validation")
+                    else:
+                        doc_key_for_validation = security_key
+
+                    # Read and validate QR code
+                    qr_data_list = read_qr(qr_file_path)
+                    if qr_data_list:
+                        qr_data = qr_data_list[0]
+
+                        # Try to decrypt QR data if it's encrypted
+                        decrypted_data = None
+                        decryption_success = False
                         try:
-                            qr_file_path = os.path.join(output_extraction_dir_path, filename)
-                            
-                            # Generate document key if not provided
-                            if not security_key:
-                                doc_key_for_validation = security_utils.generate_document_key(doc_temp_path)
-                                print("[*] Generated document key for validation")
-                            else:
-                                doc_key_for_validation = security_key
-                            
-                            # Read and validate QR code
-                            qr_data_list = read_qr(qr_file_path)
-                            if qr_data_list:
-                                qr_data = qr_data_list[0]
-                                
-                                # Try to decrypt QR data if it's encrypted
-                                decrypted_data = None
-                                decryption_success = False
-                                try:
-                                    decrypted_data = read_secure_qr(qr_file_path, doc_key_for_validation)
-                                    decryption_success = True
-                                    print(f"[*] Successfully decrypted QR: {filename}")
-                                except Exception:
-                                    # QR might be plain text
-                                    decrypted_data = qr_data
-                                    print(f"[*] QR appears to be unencrypted: {filename}")
-                                
-                                # Perform document integrity verification if requested
-                                document_integrity_valid = True
-                                if verify_document_auth:
-                                    try:
-                                        document_hash = security_utils.generate_document_hash(doc_temp_path)
-                                        # Verify document hasn't been tampered with
-                                        document_integrity_valid = security_utils.verify_document_integrity(doc_temp_path, doc_key_for_validation)
-                                        print(f"[*] Document integrity check: {'PASSED' if document_integrity_valid else 'FAILED'}")
-                                    except Exception as e:
-                                        print(f"[!] Document integrity check error: {e}")
-                                        document_integrity_valid = False
-                                
-                                # Perform QR authorization check if requested
-                                qr_authorization_valid = True
-                                authorization_results = None
-                                if check_qr_auth:
-                                    try:
-                                        document_hash = security_utils.generate_document_hash(doc_temp_path)
-                                        authorization_results = validate_qr_security(decrypted_data, doc_key_for_validation, document_hash)
-                                        qr_authorization_valid = authorization_results['overall_valid']
-                                        print(f"[*] QR authorization check: {'PASSED' if qr_authorization_valid else 'FAILED'}")
-                                    except Exception as e:
-                                        print(f"[!] QR authorization check error: {e}")
-                                        qr_authorization_valid = False
-                                        authorization_results = {"error": str(e), "overall_valid": False}
-                                
-                                # Calculate security score
-                                security_score = 0
-                                if decryption_success:
-                                    security_score += 30
-                                if document_integrity_valid:
-                                    security_score += 30
-                                if qr_authorization_valid:
-                                    security_score += 40
-                                
-                                security_info = {
-                                    "filename": filename,
-                                    "is_encrypted": decryption_success,
-                                    "decrypted_data": decrypted_data,
-                                    "document_integrity_valid": document_integrity_valid,
-                                    "qr_authorization_valid": qr_authorization_valid,
-                                    "authorization_results": authorization_results,
-                                    "security_score": security_score,
-                                    "is_authorized": qr_authorization_valid and document_integrity_valid,
-                                    "original_qr_data_length": len(qr_data)
-                                }
-                                
-                                # Add security info to QR info
-                                qr_info.update({
-                                    "security_validation": qr_authorization_valid and document_integrity_valid,
-                                    "decrypted_data": decrypted_data,
-                                    "is_encrypted": decryption_success,
-                                    "security_score": security_score,
-                                    "document_integrity": document_integrity_valid,
-                                    "qr_authorization": qr_authorization_valid
-                                })
-                                
-                                security_results.append(security_info)
-                                
-                            else:
-                                security_results.append({
-                                    "filename": filename,
-                                    "error": "Could not read QR code data",
-                                    "is_authorized": False,
-                                    "security_score": 0
-                                })
-                                
-                        except Exception as security_e:
-                            print(f"[!] Security validation error for {filename}: {security_e}")
-                            security_results.append({
-                                "filename": filename,
-                                "error": str(security_e),
-                                "is_authorized": False,
-                                "security_score": 0
-                            })
-                    
-                    extracted_qrs_info.append(qr_info)
+                            decrypted_data = read_secure_qr(qr_file_path, doc_key_for_validation)
+                            decryption_success = True
+                            print(f"[*] Successfully decrypted QR: {filename}")
+                        except Exception:
+                            # QR might be plain text
+                            decrypted_data = qr_data
+                            print(f"[*] QR appears to be unencrypted: {filename}")
+
+                        # Perform document integrity verification if requested
+                        document_integrity_valid = True
+                        if verify_document_auth:
+                            try:
+                                document_hash = security_utils.generate_document_hash(doc_temp_path)
+                                # Verify document hasn't been tampered with
+                                document_integrity_valid = security_utils.verify_document_integrity(doc_temp_path, doc_key_for_validation)
+                                print(f"[*] Document integrity check: {'PASSED' if document_integrity_valid else 'FAILED'}")
+                            except Exception as e:
+                                print(f"[!] Document integrity check error: {e}")
+                                document_integrity_valid = False
+
+                        # Perform QR authorization check if requested
+                        qr_authorization_valid = True
+                        authorization_results = None
+                        if check_qr_auth:
+                            try:
+                                document_hash = security_utils.generate_document_hash(doc_temp_path)
+                                authorization_results = validate_qr_security(decrypted_data, doc_key_for_validation, document_hash)
+                                qr_authorization_valid = authorization_results['overall_valid']
+                                print(f"[*] QR authorization check: {'PASSED' if qr_authorization_valid else 'FAILED'}")
+                            except Exception as e:
+                                print(f"[!] QR authorization check error: {e}")
+                                qr_authorization_valid = False
+                                authorization_results = {"error": str(e), "overall_valid": False}
+
+                        # Calculate security score
+                        security_score = 0
+                        if decryption_success:
+                            security_score += 30
+                        if document_integrity_valid:
+                            security_score += 30
+                        if qr_authorization_valid:
+                            security_score += 40
+
+                        security_info = {
+                            "filename": filename,
+                            "is_encrypted": decryption_success,
+                            "decrypted_data": decrypted_data,
+                            "document_integrity_valid": document_integrity_valid,
+                            "qr_authorization_valid": qr_authorization_valid,
+                            "authorization_results": authorization_results,
+                            "security_score": security_score,
+                            "is_authorized": qr_authorization_valid and document_integrity_valid,
+                            "original_qr_data_length": len(qr_data)
+                        }
+
+                        # Add security info to QR info
+                        qr_info.update({
+                            "security_validation": qr_authorization_valid and document_integrity_valid,
+                            "decrypted_data": decrypted_data,
+                            "is_encrypted": decryption_success,
+                            "security_score": security_score,
+                            "document_integrity": document_integrity_valid,
+                            "qr_authorization": qr_authorization_valid
+                        })
+
+                        security_results.append(security_info)
+
+                    else:
+                        security_results.append({
+                            "filename": filename,
+                            "error": "Could not read QR code data",
+                            "is_authorized": False,
+                            "security_score": 0
+                        })
+
+                except Exception as security_e:
+                    print(f"[!] Security validation error for {filename}: {security_e}")
+                    security_results.append({
+                        "filename": filename,
+                        "error": str(security_e),
+                        "is_authorized": False,
+                        "security_score": 0
+                    })
+
+            extracted_qrs_info.append(qr_info)
 
         if not extracted_qrs_info and "Tidak ada gambar yang ditemukan" not in result["stdout"]:
             pass
 
-        # Hapus file temporary setelah selesai
-        if os.path.exists(doc_temp_path):
-            os.remove(doc_temp_path)
-
         print(f"[*] Proses extract_{'docx' if is_docx else 'pdf'} berhasil")
         
         # Calculate security summary and update overall status
@@ -1088,10 +1546,6 @@ def extract_document_route():
             "document_integrity_status": overall_security_status["document_integrity_status"]
         })
     else:
-        # Hapus file temporary jika terjadi error
-        if os.path.exists(doc_temp_path):
-            os.remove(doc_temp_path)
-
         # Check for the specific "NO_IMAGES_FOUND" error
         if result["stderr"] and "NO_IMAGES_FOUND" in result["stderr"]:
             return jsonify({
@@ -1112,33 +1566,49 @@ def extract_document_route():
 @app.route('/download_generated/<filename>')
 def download_generated(filename):
     """Endpoint untuk mengunduh file dari folder generated."""
-    return send_from_directory(app.config['GENERATED_FOLDER'], filename, as_attachment=True)
+    return _send_download(app.config['GENERATED_FOLDER'], filename)
 
 
 @app.route('/download_documents/<filename>')
 def download_documents(filename):
     """Endpoint untuk mengunduh file dari folder documents."""
-    return send_from_directory(app.config['DOCUMENTS_FOLDER'], filename, as_attachment=True)
+    return _send_download(app.config['DOCUMENTS_FOLDER'], filename)
+
+
+def _send_download(folder, filename):
+    """Kirim file unduhan dengan ETag/Last-Modified dan Cache-Control public, immutable."""
+    if not _SAFE_NAME.match(filename):
+        abort(404)
+    response = send_from_directory(folder, filename, as_attachment=True,
+                                   conditional=True, max_age=DOWNLOAD_MAX_AGE)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+def _scan_documents(folder):
+    """Daftar dokumen .docx di folder, terbaru dulu."""
+    # scandir mengembalikan entri direktori dalam satu readdir, tanpa listdir + stat per nama
+    with os.scandir(folder) as it:
+        entries = [(e.name, e.stat()) for e in it if e.name.endswith('.docx') and e.is_file()]
+
+    documents = [{
+        'filename': name,
+        'size': st.st_size,
+        'created': st.st_ctime,
+        'download_url': url_for('download_documents', filename=name)
+    } for name, st in entries]
+
+    # Urutkan berdasarkan waktu pembuatan (terbaru dulu)
+    documents.sort(key=itemgetter('created'), reverse=True)
+    return documents
 
 
 @app.route('/list_documents')
 def list_documents():
     """Endpoint untuk melihat daftar dokumen yang tersimpan."""
     try:
-        documents = []
-        for filename in os.listdir(app.config['DOCUMENTS_FOLDER']):
-            if filename.endswith('.docx'):
-                file_path = os.path.join(app.config['DOCUMENTS_FOLDER'], filename)
-                file_stat = os.stat(file_path)
-                documents.append({
-                    'filename': filename,
-                    'size': file_stat.st_size,
-                    'created': file_stat.st_ctime,
-                    'download_url': f'/download_documents/{filename}'
-                })
-        
-        # Urutkan berdasarkan waktu pembuatan (terbaru dulu)
-        documents.sort(key=lambda x: x['created'], reverse=True)
+        documents = _scan_documents(app.config['DOCUMENTS_FOLDER'])
         
         return jsonify({
             'success': True,
@@ -1184,8 +1654,7 @@ def generate_document_key():
         additional_data = request.form.get('additional_data', '')
 
         # Check file type
-        if not (allowed_file(document_file.filename, ALLOWED_DOCX_EXTENSIONS) or 
-                allowed_file(document_file.filename, ALLOWED_PDF_EXTENSIONS)):
+        if not allowed_file(document_file.filename, ALLOWED_DOCUMENT_EXTENSIONS):
             return jsonify({
                 'success': False,
                 'error': 'Invalid file type. Only DOCX and PDF files are allowed.',
@@ -1193,9 +1662,9 @@ def generate_document_key():
             }), 400
 
         # Save the uploaded document temporarily
-        temp_filename = f"temp_doc_{uuid.uuid4().hex}_{document_file.filename}"
+        temp_filename = f"temp_doc_{secrets.token_urlsafe(8)}_{document_file.filename}"
         temp_path = os.path.join(app.config['UPLOAD_FOLDER'], temp_filename)
-        document_file.save(temp_path)
+        document_file.save(temp_path, buffer_size=UPLOAD_BUFFER_SIZE)
 
         try:
             # Generate document key
@@ -1240,8 +1709,7 @@ def generate_document_key():
         finally:
             # Clean up temporary file
             try:
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
+                _unlink(temp_path)
             except Exception as cleanup_error:
                 print(f"Warning: Failed to cleanup temp file {temp_path}: {cleanup_error}")
 
@@ -1278,7 +1746,7 @@ def generate_secure_qr_endpoint():
             }), 400
 
         # Generate unique filename for the secure QR
-        qr_filename = f"secure_qr_{uuid.uuid4().hex}.png"
+        qr_filename = f"secure_qr_{secrets.token_urlsafe(8)}.png"
         qr_path = os.path.join(app.config['GENERATED_FOLDER'], qr_filename)
 
         # Generate secure QR code
@@ -1347,8 +1815,7 @@ def validate_qr_security_endpoint():
                 'security_status': 'invalid_qr_type'
             }), 400
 
-        if not (allowed_file(document_file.filename, ALLOWED_DOCX_EXTENSIONS) or 
-                allowed_file(document_file.filename, ALLOWED_PDF_EXTENSIONS)):
+        if not allowed_file(document_file.filename, ALLOWED_DOCUMENT_EXTENSIONS):
             return jsonify({
                 'success': False,
                 'error': 'Invalid document type. Only DOCX and PDF files are allowed.',
@@ -1356,13 +1823,13 @@ def validate_qr_security_endpoint():
             }), 400
 
         # Save uploaded files temporarily
-        qr_temp_filename = f"temp_qr_{uuid.uuid4().hex}.png"
+        qr_temp_filename = f"temp_qr_{secrets.token_urlsafe(8)}.png"
         qr_temp_path = os.path.join(app.config['UPLOAD_FOLDER'], qr_temp_filename)
         qr_file.save(qr_temp_path)
 
-        doc_temp_filename = f"temp_doc_{uuid.uuid4().hex}_{document_file.filename}"
+        doc_temp_filename = f"temp_doc_{secrets.token_urlsafe(8)}_{document_file.filename}"
         doc_temp_path = os.path.join(app.config['UPLOAD_FOLDER'], doc_temp_filename)
-        document_file.save(doc_temp_path)
+        document_file.save(doc_temp_path, buffer_size=UPLOAD_BUFFER_SIZE)
 
         try:
             # Generate document key if not provided
@@ -1428,8 +1895,7 @@ def validate_qr_security_endpoint():
         finally:
             # Clean up temporary files
             for temp_file in [qr_temp_path, doc_temp_path]:
-                if os.path.exists(temp_file):
-                    os.remove(temp_file)
+                _unlink(temp_file)
 
     except Exception as e:
         return jsonify({
@@ -1460,8 +1926,7 @@ def get_document_hash():
             }), 400
 
         # Check file type
-        if not (allowed_file(document_file.filename, ALLOWED_DOCX_EXTENSIONS) or 
-                allowed_file(document_file.filename, ALLOWED_PDF_EXTENSIONS)):
+        if not allowed_file(document_file.filename, ALLOWED_DOCUMENT_EXTENSIONS):
             return jsonify({
                 'success': False,
                 'error': 'Invalid file type. Only DOCX and PDF files are allowed.',
@@ -1469,9 +1934,9 @@ def get_document_hash():
             }), 400
 
         # Save the uploaded document temporarily
-        temp_filename = f"temp_doc_{uuid.uuid4().hex}_{document_file.filename}"
+        temp_filename = f"temp_doc_{secrets.token_urlsafe(8)}_{document_file.filename}"
         temp_path = os.path.join(app.config['UPLOAD_FOLDER'], temp_filename)
-        document_file.save(temp_path)
+        document_file.save(temp_path, buffer_size=UPLOAD_BUFFER_SIZE)
 
         try:
             # Generate document hash
@@ -1492,8 +1957,7 @@ def get_document_hash():
 
         finally:
             # Clean up temporary file
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+            _unlink(temp_path)
 
     except Exception as e:
         return jsonify({
@@ -1528,8 +1992,7 @@ def embed_secure_document():
             }), 400
 
         # Validate file types
-        if not (allowed_file(document_file.filename, ALLOWED_DOCX_EXTENSIONS) or 
-                allowed_file(document_file.filename, ALLOWED_PDF_EXTENSIONS)):
+        if not allowed_file(document_file.filename, ALLOWED_DOCUMENT_EXTENSIONS):
             return jsonify({
                 'success': False,
                 'error': 'Invalid document type. Only DOCX and PDF files are allowed.',
@@ -1544,21 +2007,21 @@ def embed_secure_document():
             }), 400
 
         # Save uploaded files
-        doc_filename = f"doc_embed_in_{uuid.uuid4().hex}.{document_file.filename.rsplit('.', 1)[1].lower()}"
+        file_extension = _file_ext(document_file.filename)
+        doc_filename = f"doc_embed_in_{secrets.token_urlsafe(8)}.{file_extension}"
         doc_path = os.path.join(app.config['UPLOAD_FOLDER'], doc_filename)
-        document_file.save(doc_path)
+        document_file.save(doc_path, buffer_size=UPLOAD_BUFFER_SIZE)
 
-        qr_filename = f"qr_embed_in_{uuid.uuid4().hex}.png"
+        qr_filename = f"qr_embed_in_{secrets.token_urlsafe(8)}.png"
         qr_path = os.path.join(app.config['UPLOAD_FOLDER'], qr_filename)
         qr_file.save(qr_path)
 
         # Generate output filename
-        file_extension = document_file.filename.rsplit('.', 1)[1].lower()
-        output_filename = f"stego_doc_{uuid.uuid4().hex}.{file_extension}"
+        output_filename = f"stego_doc_{secrets.token_urlsafe(8)}.{file_extension}"
         output_path = os.path.join(app.config['GENERATED_FOLDER'], output_filename)
 
         # Copy to documents folder for public access
-        watermarked_filename = f"watermarked_{uuid.uuid4().hex}.{file_extension}"
+        watermarked_filename = f"watermarked_{secrets.token_urlsafe(8)}.{file_extension}"
         watermarked_path = os.path.join(app.config['DOCUMENTS_FOLDER'], watermarked_filename)
 
         try:
@@ -1600,8 +2063,8 @@ def embed_secure_document():
                 )
 
             if result['success']:
-                # Copy to public documents folder
-                shutil.copy2(output_path, watermarked_path)
+                # Publish to public documents folder (hardlink/reflink bila memungkinkan)
+                fast_publish(output_path, watermarked_path)
                 
                 return jsonify({
                     'success': True,
@@ -1624,8 +2087,7 @@ def embed_secure_document():
         finally:
             # Clean up temporary files
             for temp_file in [doc_path, qr_path]:
-                if os.path.exists(temp_file):
-                    os.remove(temp_file)
+                _unlink(temp_file)
 
     except Exception as e:
         return jsonify({
@@ -2153,19 +2615,85 @@ def api_export_security_report():
 
 
 # Menjalankan aplikasi Flask
-if __name__ == '__main__':
-    ports = [5001, 5002, 5003, 5004, 5005]
+def _bind_first_free_port(ports, host='0.0.0.0'):
+    """Bind socket listening ke port pertama yang masih kosong.
 
+    Probe dilakukan dengan socket biasa, bukan dengan menjalankan server Flask lalu menangkap
+    OSError, sehingga server hanya dinyalakan sekali pada port yang sudah pasti bisa dipakai.
+
+    Args:
+        ports (list[int]): Daftar port yang dicoba berurutan.
+        host (str): Alamat bind.
+
+    Returns:
+        tuple: (socket, port) untuk port pertama yang berhasil, atau (None, None).
+    """
     for port in ports:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        if os.name == 'nt':
+            # Di Windows SO_REUSEADDR membuat bind berhasil pada port yang sedang dipakai proses lain,
+            # jadi port sibuk tidak terdeteksi; SO_EXCLUSIVEADDRUSE justru menolak berbagi port
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_EXCLUSIVEADDRUSE, 1)
+        else:
+            # SO_REUSEADDR: boleh bind ulang port yang masih TIME_WAIT setelah restart.
+            # Sengaja bukan SO_REUSEPORT, karena itu membuat dua instance bisa berbagi port yang sama.
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         try:
-            print(f"Mencoba menjalankan aplikasi pada port {port}...")
-            app.run(debug=True, host='0.0.0.0', port=port)
-            break  # Keluar dari loop jika berhasil
-        except OSError as e:
-            if "Address already in use" in str(e):
-                print(f"Port {port} sudah digunakan. Mencoba port berikutnya...")
-            else:
-                print(f"Error: {e}")
-                break
-    else:
+            sock.bind((host, port))
+            sock.listen(128)
+        except OSError:
+            sock.close()
+            print(f"Port {port} sudah digunakan. Mencoba port berikutnya...")
+            continue
+        return sock, port
+    return None, None
+
+
+# Thread per worker server. Output pipeline ditangkap per thread (run_in_process), jadi request
+# yang tumpang tindih aman; STENO_THREADS menimpa default masing-masing server
+WAITRESS_THREADS = max(1, int(os.environ.get('STENO_THREADS', '8')))
+GUNICORN_THREADS = max(1, int(os.environ.get('STENO_THREADS', '4')))
+
+
+def _serve_with_gunicorn(listen_socket):
+    """Ganti proses ini dengan gunicorn (worker gthread) jika tersedia. Tidak kembali jika berhasil."""
+    # Hanya gunicorn dari environment Python ini (bukan sembarang gunicorn di PATH)
+    if os.name == 'nt' or importlib.util.find_spec('gunicorn') is None:
+        return False
+
+    # gunicorn mewarisi socket yang sudah di-bind lewat fd://
+    os.set_inheritable(listen_socket.fileno(), True)
+    workers = str(os.cpu_count() or 1)
+    # Satu proses embed per worker: total process pool = jumlah CPU, bukan CPU x CPU
+    os.environ.setdefault('STENO_JOB_PROCESSES', '1')
+    print(f"[*] Menjalankan gunicorn ({workers} worker gthread, {GUNICORN_THREADS} thread)...")
+    os.execv(sys.executable, [
+        sys.executable, '-m', 'gunicorn', '-k', 'gthread', '-w', workers, '--threads', str(GUNICORN_THREADS),
+        '--chdir', BASE_DIR, '-b', f'fd://{listen_socket.fileno()}', 'app:app'
+    ])
+
+
+if __name__ == '__main__':
+    ports = [5001, 5002, 5003, 5004, 5005]
+
+    listen_socket, port = _bind_first_free_port(ports)
+    if listen_socket is None:
         print("Semua port yang dicoba sudah digunakan. Harap tutup beberapa aplikasi dan coba lagi.")
+        sys.exit(1)
+    print(f"[*] Aplikasi berjalan pada port {port}")
+
+    # STENO_DEBUG=1 untuk development (reloader + debugger). Tanpa itu aplikasi dijalankan
+    # dengan server WSGI produksi (gunicorn, lalu waitress) agar embed dari banyak pengguna tidak antre satu per satu.
+    debug_mode = os.environ.get('STENO_DEBUG', '0') == '1'
+    if debug_mode:
+        # Reloader Werkzeug mem-bind port sendiri di proses anak
+        listen_socket.close()
+        app.run(debug=True, host='0.0.0.0', port=port, threaded=True)
+    else:
+        _serve_with_gunicorn(listen_socket)
+        if waitress_serve is not None:
+            print(f"[*] gunicorn tidak tersedia, menjalankan waitress ({WAITRESS_THREADS} thread)...")
+            waitress_serve(app, sockets=[listen_socket], threads=WAITRESS_THREADS)
+            sys.exit(0)
+        print("[!] gunicorn/waitress tidak tersedia, memakai server bawaan Werkzeug (multi-thread)")
+        make_server('0.0.0.0', port, app, threaded=True, fd=listen_socket.fileno()).serve_forever()
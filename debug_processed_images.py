@@ -38,14 +38,18 @@ def simulate_data_flow():
     # Find a processed directory to simulate data
     static_path = "static/generated"
     if os.path.exists(static_path):
-        processed_dirs = [d for d in os.listdir(static_path) if d.startswith('processed_')]
+        # scandir membawa tipe entri dari readdir, jadi tidak perlu stat terpisah per nama
+        with os.scandir(static_path) as it:
+            processed_dirs = [e.name for e in it if e.is_dir() and e.name.startswith('processed_')]
         
         if processed_dirs:
             sample_dir = processed_dirs[0]
             print(f"📁 Using sample directory: {sample_dir}")
             
             dir_path = os.path.join(static_path, sample_dir)
-            files = os.listdir(dir_path)
+            with os.scandir(dir_path) as it:
+                entries = {e.name: e for e in it}
+            files = list(entries)
             
             # Find original and watermarked files
             original_files = sorted([f for f in files if f.startswith('original_')])
@@ -76,9 +80,11 @@ def simulate_data_flow():
                 print(f"   Original: {orig_frontend}")
                 print(f"   Watermarked: {water_frontend}")
                 
-                # Check if files exist
-                orig_exists = os.path.exists(f"static/generated/{img['original']}")
-                water_exists = os.path.exists(f"static/generated/{img['watermarked']}")
+                # Check if files exist (DirEntry dari scandir di atas dicari per nama file, tanpa stat ulang)
+                orig_entry = entries.get(os.path.basename(img['original']))
+                water_entry = entries.get(os.path.basename(img['watermarked']))
+                orig_exists = orig_entry is not None and orig_entry.is_file()
+                water_exists = water_entry is not None and water_entry.is_file()
                 print(f"   Exists: Orig={orig_exists}, Water={water_exists}")
                 print()
             
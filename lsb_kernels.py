@@ -0,0 +1,141 @@
+# File: lsb_kernels.py
+# Deskripsi: Kernel LSB channel Biru yang dipakai lsb_steganography (Numba bila tersedia, NumPy bila tidak).
+
+import threading
+
+import numpy as np
+try:
+    from numba import njit, prange  # Opsional: kernel LSB terkompilasi
+except ImportError:
+    njit = None
+
+# Ukuran blok (dalam piksel) untuk kernel LSB NumPy: 256 K byte channel Biru per blok, jadi pass
+# AND/OR (load-modify-store) dan buffer sementaranya tetap di L2 saat memproses citra besar (mis. 8K).
+# Harus kelipatan 8 agar kernel versi packed memulai tiap blok di batas byte.
+LSB_TILE_PIXELS = 256 * 1024
+
+
+# Dengan Numba, loop byte dikompilasi LLVM (auto-vektorisasi) dan dibagi ke semua core lewat prange.
+# Signature eksplisit membuat kompilasi terjadi sekali saat import (lalu dari cache di disk), bukan
+# pada panggilan pertama. blue adalah view berstride (flat[2::3]) sehingga memakai layout 'A' (uint8[:]).
+if njit is not None:
+    from numba import types
+
+    _u8_readonly = types.Array(types.uint8, 1, 'A', readonly=True)  # np.asarray(PIL Image) read-only
+
+    @njit('void(uint8[:], uint8[::1])', cache=True, parallel=True, boundscheck=False)
+    def _embed_blue_lsb(blue, bits):
+        """Tulis bits (0/1) ke LSB blue[:bits.size] secara in-place."""
+        for i in prange(bits.size):
+            blue[i] = (blue[i] & 0xFE) | bits[i]
+
+    @njit([types.void(types.uint8[:], types.uint8[::1], types.int64),
+           types.void(_u8_readonly, types.uint8[::1], types.int64)],
+          cache=True, parallel=True, boundscheck=False)
+    def _extract_blue_lsb(blue, out_bits, n):
+        """Salin LSB blue[:n] ke out_bits[:n]."""
+        for i in prange(n):
+            out_bits[i] = blue[i] & 1
+
+    @njit([types.void(types.uint8[:], types.uint8[::1], types.int64),
+           types.void(types.uint8[:], types.Array(types.uint8, 1, 'C', readonly=True), types.int64)],
+          cache=True, parallel=True, boundscheck=False)
+    def _embed_blue_lsb_packed(blue, packed, n):
+        """Tulis n bit pertama dari packed (8 bit/byte, MSB dulu) ke LSB blue[:n] secara in-place."""
+        for i in prange(n):
+            blue[i] = (blue[i] & 0xFE) | ((packed[i >> 3] >> (7 - (i & 7))) & 1)
+
+    @njit([types.void(types.uint8[:], types.uint8[::1], types.int64),
+           types.void(_u8_readonly, types.uint8[::1], types.int64)],
+          cache=True, parallel=True, boundscheck=False)
+    def _extract_blue_lsb_packed(blue, out_packed, n):
+        """Kemas LSB blue[:n] ke out_packed (8 bit/byte, MSB dulu, sisa byte terakhir diisi 0)."""
+        for j in prange((n + 7) >> 3):
+            acc = 0
+            for t in range(8):
+                i = (j << 3) + t
+                acc <<= 1
+                if i < n:
+                    acc |= blue[i] & 1
+            out_packed[j] = acc
+
+    # Kernel dipanggil bersamaan dari thread request/job/server. Threading layer 'workqueue' (dipakai
+    # Numba bila TBB dan OpenMP tidak tersedia) membatalkan proses jika dua region paralel berjalan
+    # bersamaan, jadi layer yang benar-benar terpilih dicek sekali (panggilan kecil memicu pemilihannya).
+    from numba import threading_layer
+    _embed_blue_lsb(np.zeros(1, dtype=np.uint8), np.zeros(1, dtype=np.uint8))
+    NUMBA_LAYER_THREADSAFE = threading_layer() != 'workqueue'
+else:
+    import os
+    from concurrent.futures import ThreadPoolExecutor
+
+    # Tanpa Numba, blok-blok dibagi ke thread: ufunc NumPy melepas GIL, dan tiap blok independen
+    # (tidak ada ketergantungan antar blok), jadi AND/OR berjalan paralel di semua core.
+    LSB_THREADS = os.cpu_count() or 1
+    _lsb_pool = None
+
+    def _run_blocks(block_fn, n):
+        """Jalankan block_fn(start, stop) untuk tiap blok LSB_TILE_PIXELS; paralel bila n cukup besar."""
+        global _lsb_pool
+        blocks = [(start, min(start + LSB_TILE_PIXELS, n)) for start in range(0, n, LSB_TILE_PIXELS)]
+        if LSB_THREADS == 1 or len(blocks) < 4:
+            for start, stop in blocks:
+                block_fn(start, stop)
+            return
+        if _lsb_pool is None:
+            _lsb_pool = ThreadPoolExecutor(max_workers=LSB_THREADS, thread_name_prefix='lsb')
+        for _ in _lsb_pool.map(lambda block: block_fn(*block), blocks):
+            pass
+
+    def _embed_blue_lsb(blue, bits):
+        """Tulis bits (0/1) ke LSB blue[:bits.size] secara in-place, per blok LSB_TILE_PIXELS."""
+        def block(start, stop):
+            t = np.bitwise_and(blue[start:stop], 0xFE)
+            np.bitwise_or(t, bits[start:stop], out=t)
+            blue[start:stop] = t
+        _run_blocks(block, bits.size)
+
+    def _extract_blue_lsb(blue, out_bits, n):
+        """Salin LSB blue[:n] ke out_bits[:n], per blok LSB_TILE_PIXELS."""
+        def block(start, stop):
+            np.bitwise_and(blue[start:stop], 1, out=out_bits[start:stop])
+        _run_blocks(block, n)
+
+    def _embed_blue_lsb_packed(blue, packed, n):
+        """Tulis n bit pertama dari packed (8 bit/byte, MSB dulu) ke LSB blue[:n], di-unpack per blok."""
+        def block(start, stop):  # LSB_TILE_PIXELS kelipatan 8: blok mulai di batas byte
+            bits = np.unpackbits(packed[start >> 3:(stop + 7) >> 3], count=stop - start)
+            t = np.bitwise_and(blue[start:stop], 0xFE)
+            np.bitwise_or(t, bits, out=t)
+            blue[start:stop] = t
+        _run_blocks(block, n)
+
+    def _extract_blue_lsb_packed(blue, out_packed, n):
+        """Kemas LSB blue[:n] ke out_packed (8 bit/byte, MSB dulu, sisa byte terakhir diisi 0)."""
+        def block(start, stop):
+            out_packed[start >> 3:(stop + 7) >> 3] = np.packbits(np.bitwise_and(blue[start:stop], 1))
+        _run_blocks(block, n)
+
+
+# Satu lock untuk semua kernel paralel Numba di proses ini (termasuk _sse_u8 di app.py):
+# workqueue tidak boleh menjalankan dua region paralel sekaligus, apa pun kernelnya.
+_numba_lock = threading.Lock()
+
+
+def _serialize_on_workqueue(kernel):
+    """Bungkus kernel Numba parallel=True dengan lock bila threading layer-nya workqueue."""
+    if njit is None or NUMBA_LAYER_THREADSAFE:
+        return kernel
+
+    def locked(*args):
+        with _numba_lock:
+            return kernel(*args)
+    locked.__doc__ = kernel.__doc__
+    return locked
+
+
+if njit is not None:
+    _embed_blue_lsb = _serialize_on_workqueue(_embed_blue_lsb)
+    _extract_blue_lsb = _serialize_on_workqueue(_extract_blue_lsb)
+    _embed_blue_lsb_packed = _serialize_on_workqueue(_embed_blue_lsb_packed)
+    _extract_blue_lsb_packed = _serialize_on_workqueue(_extract_blue_lsb_packed)
@@ -3,12 +3,117 @@
 
 from PIL import Image
 from PIL.Image import Resampling
-import itertools
+import numpy as np
 import os
 import math
+import binascii
+import struct
+from bisect import bisect_right
+from functools import lru_cache, wraps
+from lsb_kernels import _embed_blue_lsb, _extract_blue_lsb, _embed_blue_lsb_packed, _extract_blue_lsb_packed
 
 HEADER_TERMINATOR_BIN = '00000000'
 HEADER_TERMINATOR_LEN = len(HEADER_TERMINATOR_BIN)
+# Panjang header standar: 16 bit lebar + 16 bit tinggi + terminator
+LSB_HEADER_BITS = 16 + 16 + HEADER_TERMINATOR_LEN
+
+# Level zlib untuk PNG hasil (0-9). Level 1 meng-encode beberapa kali lebih cepat dari default (6)
+# dengan file sedikit lebih besar; piksel (dan LSB) tetap identik karena PNG lossless.
+PNG_COMPRESS_LEVEL = 1
+
+# Mode LSB multi-bit: byte terminator header menyimpan mode penyisipan data QR.
+# 0 = mode lama (1 bit LSB channel Biru); selain itu 0x80 | ((bits_per_channel - 1) << 3) | mask
+# channel (R=4, G=2, B=1). Header sendiri selalu di LSB Biru 40 piksel pertama.
+_CHANNEL_INDEX = {'R': 0, 'G': 1, 'B': 2}
+MAX_BITS_PER_CHANNEL = 4
+
+# Tabel versi QR (dimensi modul = 17 + 4 x versi) untuk recommend_qr_config_for_capacity;
+# _QR_DIMS terurut sehingga versi terbesar yang muat dicari dengan bisect.
+_QR_DIMS = tuple(17 + 4 * version for version in range(1, 41))
+_QR_VERSIONS = tuple(range(1, 41))
+# Perkiraan kapasitas data (karakter) per versi QR, indeks = versi - 1
+_QR_CAPACITY_ESTIMATES = (
+    25, 47, 77, 114, 154, 195, 224, 279, 335, 395,
+    468, 535, 619, 667, 758, 854, 938, 1046, 1153, 1249,
+    1352, 1460, 1588, 1704, 1853, 1990, 2132, 2223, 2369, 2520,
+    2677, 2840, 3009, 3183, 3351, 3537, 3729, 3927, 4087, 4296,
+)
+
+
+def _lsb_mode_byte(bits_per_channel: int, channels) -> int:
+    """Encode mode penyisipan ke byte terminator header (0 untuk mode lama 1 bit channel Biru)."""
+    if not 1 <= bits_per_channel <= MAX_BITS_PER_CHANNEL:
+        raise ValueError(f"bits_per_channel harus 1-{MAX_BITS_PER_CHANNEL}.")
+    if not channels or any(ch not in _CHANNEL_INDEX for ch in channels):
+        raise ValueError("channels harus berisi kombinasi 'R', 'G', 'B'.")
+    if bits_per_channel == 1 and set(channels) == {'B'}:
+        return 0
+    mask = 0
+    for ch in channels:
+        mask |= 4 >> _CHANNEL_INDEX[ch]
+    return 0x80 | ((bits_per_channel - 1) << 3) | mask
+
+
+def _parse_lsb_mode_byte(mode_byte: int):
+    """Kebalikan _lsb_mode_byte: (bits_per_channel, indeks channel terurut R, G, B)."""
+    if mode_byte == 0:
+        return 1, (2,)
+    if not mode_byte & 0x80 or mode_byte & 0x60 or not mode_byte & 0x07:
+        raise ValueError("Terminator header tidak ditemukan dalam batas wajar piksel.")
+    channel_indices = tuple(i for i in range(3) if mode_byte & (4 >> i))
+    return ((mode_byte >> 3) & 0x03) + 1, channel_indices
+
+
+def _lsb_capacity(width: int, height: int, bits_per_pixel: int = 1) -> int:
+    """Kapasitas bit citra: header 40 bit di LSB Biru, sisa piksel menampung bits_per_pixel bit."""
+    pixels = width * height
+    if bits_per_pixel == 1 or pixels <= LSB_HEADER_BITS:
+        return pixels
+    return LSB_HEADER_BITS + (pixels - LSB_HEADER_BITS) * bits_per_pixel
+
+
+def _embed_multibit(pixels: np.ndarray, bits: np.ndarray, bits_per_channel: int, channel_indices) -> None:
+    """
+    Tulis bits ke bits_per_channel bit terendah channel terpilih (in-place).
+    pixels: array (P, 3) uint8; bit diisi piksel demi piksel, channel R->G->B, MSB dulu.
+    """
+    k = bits_per_channel
+    n_lanes = -(-bits.size // k)
+    padded = np.zeros(n_lanes * k, dtype=np.uint8)
+    padded[:bits.size] = bits
+    # packbits mengisi dari MSB, jadi k bit berada di bagian atas byte lalu digeser ke bawah
+    values = np.packbits(padded.reshape(n_lanes, k), axis=1).ravel() >> (8 - k)
+    lanes = pixels[:, channel_indices].reshape(-1)  # Salinan (fancy indexing), aman diubah in-place
+    used = lanes[:n_lanes]
+    np.bitwise_and(used, 0xFF ^ ((1 << k) - 1), out=used)
+    np.bitwise_or(used, values, out=used)
+    pixels[:, channel_indices] = lanes.reshape(-1, len(channel_indices))
+
+
+def _extract_multibit(pixels: np.ndarray, n_bits: int, bits_per_channel: int, channel_indices) -> np.ndarray:
+    """Kebalikan _embed_multibit: ambil n_bits bit (0/1) dari pixels (P, 3)."""
+    k = bits_per_channel
+    n_lanes = -(-n_bits // k)
+    lanes = pixels[:, channel_indices].reshape(-1)[:n_lanes]  # Salinan (fancy indexing)
+    np.bitwise_and(lanes, (1 << k) - 1, out=lanes)
+    np.left_shift(lanes, 8 - k, out=lanes)
+    return np.unpackbits(lanes[:, None], axis=1, count=k).ravel()[:n_bits]
+
+
+def _silent(*args, **kwargs):
+    """Pengganti print untuk log proses [*] saat verbose=False."""
+
+
+def _open_image(path: str, mode: str) -> Image.Image:
+    """
+    Buka citra dalam mode tertentu. convert() selalu membuat salinan penuh meskipun mode
+    sudah sama, jadi citra yang sudah dalam mode tujuan (umumnya PNG RGB) cukup di-load saja.
+    """
+    img = Image.open(path)
+    if img.mode == mode:
+        img.load()  # Decode sekarang dan lepas file handle, seperti setelah convert()
+        return img
+    return img.convert(mode)
 
 
 def _int_to_binary(integer: int, bits: int) -> str:
@@ -31,6 +136,7 @@ def _embed_bit(pixel_value: int, bit: str) -> int:
     dari sebuah nilai integer (byte piksel).
     Jika bit = '0', LSB di-set ke 0.
     Jika bit = '1', LSB di-set ke 1.
+    Legacy: jalur embed memakai operasi array (_embed_blue_lsb), fungsi ini dipertahankan untuk kompatibilitas API.
     """
     if bit == '0':
         return pixel_value & 254
@@ -42,44 +148,77 @@ def _extract_lsb(pixel_value: int) -> str:
     """
     Mengekstrak LSB dari sebuah nilai integer (byte piksel).
     Mengembalikan '1' jika nilai ganjil (LSB=1), '0' jika genap (LSB=0).
+    Legacy: jalur ekstraksi memakai operasi array (_extract_blue_lsb), fungsi ini dipertahankan untuk kompatibilitas API.
     """
     return '1' if pixel_value % 2 == 1 else '0'
 
 
-def _resize_qr_for_capacity(qr_img, max_capacity: int):
+def _resize_qr_for_capacity(qr_img, max_capacity: int, log=print):
     """
     Menyesuaikan ukuran QR code agar muat dalam kapasitas citra penampung.
 
     Args:
         qr_img: Objek Image dari QR code yang perlu disesuaikan.
         max_capacity: Kapasitas maksimum yang tersedia dalam bit.
+        log: Fungsi log (print, atau _silent untuk mode tidak verbose).
 
     Returns:
         Objek Image dari QR code yang telah diresize.
     """
     # Kurangi kapasitas untuk header (16+16+8 bit)
-    available_bits_for_qr = max_capacity - (16 + 16 + HEADER_TERMINATOR_LEN)
+    available_bits_for_qr = max_capacity - LSB_HEADER_BITS
 
     if available_bits_for_qr <= 0:
         raise ValueError("Kapasitas cover image terlalu kecil bahkan untuk header saja.")
 
     # Hitung dimensi maksimum berdasarkan akar kuadrat dari kapasitas
     # Kita perlu bilangan bulat yang ketika dikuadratkan <= available_bits_for_qr
-    new_dimension = int(math.sqrt(available_bits_for_qr))
+    new_dimension = math.isqrt(available_bits_for_qr)
 
     # Jika QR lebih kecil dari dimensi maksimal, tidak perlu diresize
     if qr_img.width <= new_dimension and qr_img.height <= new_dimension:
         return qr_img
 
-    # Resize QR secara proporsional tapi tidak lebih besar dari dimensi maksimum
-    new_size = min(new_dimension, new_dimension)
-    # Resize QR code dengan tetap mempertahankan mode
-    resized_qr = qr_img.resize((new_size, new_size), Resampling.NEAREST)
-    print(f"[*] QR code diresize dari {qr_img.width}x{qr_img.height} ke {new_size}x{new_size} agar muat dalam kapasitas.")
+    # Perkecil dengan faktor bulat agar NEAREST tidak merusak batas modul QR: cari pembagi
+    # lebar QR terkecil yang membuat ukuran <= new_dimension (mis. box_size qrcode), jika tidak
+    # ada yang dekat pakai floor(lebar / faktor).
+    qr_mod = max(qr_img.width, qr_img.height)  # QR diasumsikan persegi
+    k_down = math.ceil(qr_mod / max(new_dimension, 1))
+    factor = next((d for d in range(k_down, 2 * k_down + 1) if qr_mod % d == 0), k_down)
+    new_size = max(1, qr_mod // factor)
+    if qr_img.mode == '1' and qr_img.width == qr_img.height == new_size * factor:
+        # Faktor bulat: NEAREST sama dengan mengambil piksel tengah tiap blok factor x factor,
+        # jadi cukup slicing berstride tanpa grid resampling Pillow
+        offset = factor // 2
+        resized_qr = Image.fromarray(np.asarray(qr_img)[offset::factor, offset::factor])
+    else:
+        # Resize QR code dengan tetap mempertahankan mode
+        resized_qr = qr_img.resize((new_size, new_size), Resampling.NEAREST)
+    log(f"[*] QR code diresize dari {qr_img.width}x{qr_img.height} ke {new_size}x{new_size} agar muat dalam kapasitas.")
     return resized_qr
 
 
-def validate_qr_for_image(qr_width: int, qr_height: int, image_width: int, image_height: int) -> dict:
+def _dict_lru_cache(maxsize: int = 256):
+    """
+    lru_cache untuk fungsi murni yang mengembalikan dict berisi nilai immutable. Hasil cache tidak
+    pernah diberikan langsung; tiap pemanggil menerima salinan dict sehingga aman diubah.
+    """
+    def decorator(func):
+        cached = lru_cache(maxsize=maxsize)(func)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return dict(cached(*args, **kwargs))
+
+        wrapper.cache_info = cached.cache_info
+        wrapper.cache_clear = cached.cache_clear
+        return wrapper
+    return decorator
+
+
+@_dict_lru_cache()
+def validate_qr_for_image(qr_width: int, qr_height: int, image_width: int, image_height: int,
+                          bits_per_pixel: int = 1) -> dict:
     """
     Validasi apakah QR Code dapat disimpan dalam gambar dengan kapasitas yang tersedia.
     
@@ -88,6 +227,7 @@ def validate_qr_for_image(qr_width: int, qr_height: int, image_width: int, image
         qr_height: Tinggi QR Code dalam pixel  
         image_width: Lebar gambar penampung dalam pixel
         image_height: Tinggi gambar penampung dalam pixel
+        bits_per_pixel: Bit data QR per piksel (bits_per_channel x jumlah channel; 1 = mode lama)
     
     Returns:
         dict: Hasil validasi dengan informasi detail
@@ -101,12 +241,12 @@ def validate_qr_for_image(qr_width: int, qr_height: int, image_width: int, image
             - 'warning': str - Peringatan jika ada
     """
     # Hitung kebutuhan bit
-    header_bits = 16 + 16 + HEADER_TERMINATOR_LEN  # width + height + terminator
+    header_bits = LSB_HEADER_BITS  # width + height + terminator
     qr_bits = qr_width * qr_height
     total_bits_needed = header_bits + qr_bits
     
-    # Hitung kapasitas gambar (menggunakan blue channel LSB)
-    image_capacity = image_width * image_height
+    # Hitung kapasitas gambar (menggunakan blue channel LSB, atau multi-bit bila bits_per_pixel > 1)
+    image_capacity = _lsb_capacity(image_width, image_height, bits_per_pixel)
     
     # Hitung utilization dan sisa kapasitas
     utilization_percentage = (total_bits_needed / image_capacity * 100) if image_capacity > 0 else 0
@@ -138,6 +278,7 @@ def validate_qr_for_image(qr_width: int, qr_height: int, image_width: int, image
     }
 
 
+@_dict_lru_cache()
 def recommend_qr_config_for_capacity(image_capacity: int, text_length: int = 0) -> dict:
     """
     Merekomendasikan konfigurasi QR Code optimal berdasarkan kapasitas gambar.
@@ -157,7 +298,7 @@ def recommend_qr_config_for_capacity(image_capacity: int, text_length: int = 0)
             - 'rationale': str - Alasan rekomendasi
     """
     # Kurangi kapasitas untuk header
-    available_bits = image_capacity - (16 + 16 + HEADER_TERMINATOR_LEN)
+    available_bits = image_capacity - LSB_HEADER_BITS
     
     if available_bits <= 0:
         return {
@@ -171,25 +312,11 @@ def recommend_qr_config_for_capacity(image_capacity: int, text_length: int = 0)
         }
     
     # Hitung dimensi maksimum QR yang bisa ditampung
-    max_qr_dimension = int(math.sqrt(available_bits))
+    max_qr_dimension = math.isqrt(available_bits)
     
-    # QR Version mapping (approximate)
-    qr_versions = [
-        (21, 1), (25, 2), (29, 3), (33, 4), (37, 5), (41, 6), (45, 7), (49, 8),
-        (53, 9), (57, 10), (61, 11), (65, 12), (69, 13), (73, 14), (77, 15),
-        (81, 16), (85, 17), (89, 18), (93, 19), (97, 20), (101, 21), (105, 22),
-        (109, 23), (113, 24), (117, 25), (121, 26), (125, 27), (129, 28),
-        (133, 29), (137, 30), (141, 31), (145, 32), (149, 33), (153, 34),
-        (157, 35), (161, 36), (165, 37), (169, 38), (173, 39), (177, 40)
-    ]
-    
-    # Temukan versi QR terbesar yang masih muat
-    recommended_version = 1
-    for dimension, version in qr_versions:
-        if dimension <= max_qr_dimension:
-            recommended_version = version
-        else:
-            break
+    # Temukan versi QR terbesar yang masih muat (QR Version mapping: _QR_DIMS)
+    idx = bisect_right(_QR_DIMS, max_qr_dimension) - 1
+    recommended_version = _QR_VERSIONS[idx] if idx >= 0 else 1
     
     # Tentukan box size berdasarkan dimensi yang tersedia
     if max_qr_dimension >= 200:
@@ -209,15 +336,7 @@ def recommend_qr_config_for_capacity(image_capacity: int, text_length: int = 0)
     
     # Perkiraan kapasitas data berdasarkan versi QR
     # Ini adalah perkiraan kasar berdasarkan QR version
-    capacity_estimates = {
-        1: 25, 2: 47, 3: 77, 4: 114, 5: 154, 6: 195, 7: 224, 8: 279, 9: 335, 10: 395,
-        11: 468, 12: 535, 13: 619, 14: 667, 15: 758, 16: 854, 17: 938, 18: 1046,
-        19: 1153, 20: 1249, 21: 1352, 22: 1460, 23: 1588, 24: 1704, 25: 1853,
-        26: 1990, 27: 2132, 28: 2223, 29: 2369, 30: 2520, 31: 2677, 32: 2840,
-        33: 3009, 34: 3183, 35: 3351, 36: 3537, 37: 3729, 38: 3927, 39: 4087, 40: 4296
-    }
-    
-    estimated_capacity = capacity_estimates.get(recommended_version, 25)
+    estimated_capacity = _QR_CAPACITY_ESTIMATES[recommended_version - 1]
     
     # Tentukan text encoding berdasarkan text_length
     if text_length == 0:
@@ -245,7 +364,9 @@ def recommend_qr_config_for_capacity(image_capacity: int, text_length: int = 0)
     }
 
 
-def embed_qr_to_image(cover_image_path: str, qr_image_path: str, output_stego_path: str, resize_qr_if_needed: bool = True):
+def embed_qr_to_image(cover_image_path: str, qr_image_path: str, output_stego_path: str, resize_qr_if_needed: bool = True,
+                      compress_level: int = PNG_COMPRESS_LEVEL, bits_per_channel: int = 1, channels: tuple = ('B',),
+                      verbose: bool = True):
     """
     Menyisipkan citra QR Code ke dalam LSB channel Biru dari citra penampung.
 
@@ -254,6 +375,12 @@ def embed_qr_to_image(cover_image_path: str, qr_image_path: str, output_stego_pa
         qr_image_path (str): Path ke citra QR Code yang akan disembunyikan (harus hitam putih).
         output_stego_path (str): Path untuk menyimpan citra hasil (harus PNG).
         resize_qr_if_needed (bool): Jika True, QR code akan diresize otomatis agar muat dalam kapasitas.
+        compress_level (int): Level kompresi zlib PNG output (0-9, default PNG_COMPRESS_LEVEL).
+        bits_per_channel (int): Jumlah bit terendah per channel untuk data QR (1-4, default 1).
+        channels (tuple): Channel penampung data QR, kombinasi 'R', 'G', 'B' (default ('B',)).
+            bits_per_channel=1 dengan channels=('B',) adalah format lama; mode lain dicatat di header
+            sehingga ekstraksi mendeteksinya otomatis.
+        verbose (bool): Jika False, log proses [*] tidak dicetak (peringatan [!] dan pesan error tetap dicetak).
 
     Raises:
         FileNotFoundError: Jika file input tidak ditemukan.
@@ -261,7 +388,8 @@ def embed_qr_to_image(cover_image_path: str, qr_image_path: str, output_stego_pa
         Exception: Jika terjadi error lain selama proses.
     """
 
-    print("[*] Memulai proses embed_qr_to_image")  # Log awal fungsi
+    log = print if verbose else _silent
+    log("[*] Memulai proses embed_qr_to_image")  # Log awal fungsi
 
     # Validasi keberadaan file input
     if not os.path.exists(cover_image_path):
@@ -273,9 +401,14 @@ def embed_qr_to_image(cover_image_path: str, qr_image_path: str, output_stego_pa
         raise ValueError("Output file harus berformat PNG untuk menjaga LSB.")
 
     try:
+        # Mode penyisipan (divalidasi lebih dulu); 1 bit channel Biru = format lama
+        mode_byte = _lsb_mode_byte(bits_per_channel, channels)
+        channel_indices = sorted({_CHANNEL_INDEX[ch] for ch in channels})
+        bits_per_pixel = bits_per_channel * len(channel_indices)
+
         # 1. Buka kedua citra
-        cover_img = Image.open(cover_image_path).convert('RGB')  # Pastikan format RGB
-        qr_img = Image.open(qr_image_path).convert('1')  # Konversi QR ke mode 1-bit (hitam/putih)
+        cover_img = _open_image(cover_image_path, 'RGB')  # Pastikan format RGB
+        qr_img = _open_image(qr_image_path, '1')  # Konversi QR ke mode 1-bit (hitam/putih)
 
         # Cek apakah file cover dan QR sama
         if os.path.abspath(cover_image_path) == os.path.abspath(qr_image_path):
@@ -285,19 +418,19 @@ def embed_qr_to_image(cover_image_path: str, qr_image_path: str, output_stego_pa
         qr_width, qr_height = qr_img.size
 
         # Use new validation function to check QR configuration
-        validation_result = validate_qr_for_image(qr_width, qr_height, cover_width, cover_height)
+        validation_result = validate_qr_for_image(qr_width, qr_height, cover_width, cover_height, bits_per_pixel)
         
         # Log validation results
-        print(f"[*] Validasi QR Configuration:")
-        print(f"    QR Size: {qr_width}x{qr_height} ({validation_result['qr_bits']} bits)")
-        print(f"    Image Capacity: {validation_result['image_capacity']} bits")
-        print(f"    Utilization: {validation_result['utilization_percentage']:.1f}%")
+        log(f"[*] Validasi QR Configuration:")
+        log(f"    QR Size: {qr_width}x{qr_height} ({validation_result['qr_bits']} bits)")
+        log(f"    Image Capacity: {validation_result['image_capacity']} bits")
+        log(f"    Utilization: {validation_result['utilization_percentage']:.1f}%")
         
         if validation_result['warning']:
             print(f"[!] {validation_result['warning']}")
 
         # Hitung kapasitas citra penampung
-        max_capacity = cover_width * cover_height
+        max_capacity = _lsb_capacity(cover_width, cover_height, bits_per_pixel)
 
         # 2. Buat aliran bit dari QR Code
         # Cek dulu jika perlu resize QR
@@ -306,13 +439,13 @@ def embed_qr_to_image(cover_image_path: str, qr_image_path: str, output_stego_pa
         # If validation fails, handle according to resize option
         if not validation_result['valid']:
             if resize_qr_if_needed:
-                print("[*] QR terlalu besar, melakukan resize otomatis...")
-                qr_img = _resize_qr_for_capacity(qr_img, max_capacity)
+                log("[*] QR terlalu besar, melakukan resize otomatis...")
+                qr_img = _resize_qr_for_capacity(qr_img, max_capacity, log)
                 qr_width, qr_height = qr_img.size
                 
                 # Re-validate after resize
-                validation_result = validate_qr_for_image(qr_width, qr_height, cover_width, cover_height)
-                print(f"[*] Setelah resize: {qr_width}x{qr_height}, Utilization: {validation_result['utilization_percentage']:.1f}%")
+                validation_result = validate_qr_for_image(qr_width, qr_height, cover_width, cover_height, bits_per_pixel)
+                log(f"[*] Setelah resize: {qr_width}x{qr_height}, Utilization: {validation_result['utilization_percentage']:.1f}%")
                 
                 if validation_result['warning']:
                     print(f"[!] {validation_result['warning']}")
@@ -328,89 +461,85 @@ def embed_qr_to_image(cover_image_path: str, qr_image_path: str, output_stego_pa
         elif validation_result['utilization_percentage'] > 75:
             print(f"[!] Peringatan: Tingkat penggunaan tinggi ({validation_result['utilization_percentage']:.1f}%)")
             recommendation = recommend_qr_config_for_capacity(max_capacity)
-            print(f"[*] Saran: Gunakan QR Version {recommendation['recommended_version']} dengan box size {recommendation['recommended_box_size']}px untuk hasil optimal")
-
-        # Perkiraan kebutuhan bit untuk header dan data QR
-        header_bits_len = 16 + 16 + HEADER_TERMINATOR_LEN
-        qr_bits_len = qr_width * qr_height
-        total_bits_needed = header_bits_len + qr_bits_len
-
-        # Jika kapasitas tidak cukup, resize QR jika opsi diaktifkan
-        if total_bits_needed > max_capacity:
-            if resize_qr_if_needed:
-                qr_img = _resize_qr_for_capacity(qr_img, max_capacity)
-                qr_width, qr_height = qr_img.size
-                print("[*] QR code diresize untuk menyesuaikan dengan kapasitas.")
-            else:
-                raise ValueError(f"Kapasitas citra tidak cukup. Dibutuhkan: {total_bits_needed} bits, Tersedia: {max_capacity} bits.")
-
-        # Iterasi piksel QR, '1' untuk hitam (nilai 0 di mode '1'), '0' untuk putih (nilai 255)
-        qr_bits = "".join(['1' if qr_img.getpixel((x, y)) == 0 else '0'
-                          for y in range(qr_height) for x in range(qr_width)])
-        num_qr_bits = len(qr_bits)
+            log(f"[*] Saran: Gunakan QR Version {recommendation['recommended_version']} dengan box size {recommendation['recommended_box_size']}px untuk hasil optimal")
+
+        # Bit QR dalam urutan baris: 1 untuk hitam (nilai 0 di mode '1'), 0 untuk putih.
+        # Mode '1' sudah tersimpan sebagai bit terpaket (1 = putih, tiap baris dibulatkan ke byte),
+        # jadi aliran bit dibiarkan terpaket (8 bit/byte) dan baru di-unpack di dalam kernel.
+        row_bytes = (qr_width + 7) // 8
+        qr_rows = np.frombuffer(qr_img.tobytes(), dtype=np.uint8).reshape(qr_height, row_bytes)
+        num_qr_bits = qr_width * qr_height
+        if qr_width % 8 == 0 and not mode_byte:
+            qr_packed = np.invert(qr_rows).reshape(-1)  # Tanpa padding baris: cukup dibalik
+            qr_bits = None
+        else:
+            # Padding tiap baris harus dibuang: unpack per baris (dipotong ke lebar QR) lalu dibalik
+            qr_bits = np.unpackbits(qr_rows, axis=1, count=qr_width).ravel()
+            qr_bits ^= 1
+            qr_packed = np.packbits(qr_bits)
 
         # 3. Buat header: 16 bit untuk lebar QR, 16 bit untuk tinggi QR, + terminator
-        header_bits = _int_to_binary(qr_width, 16) + _int_to_binary(qr_height, 16) + HEADER_TERMINATOR_BIN
-        num_header_bits = len(header_bits)
+        header_bytes = np.frombuffer(struct.pack('>HHB', qr_width, qr_height, mode_byte), dtype=np.uint8)
+        num_header_bits = header_bytes.size * 8  # 40 bit, tepat di batas byte
 
         # Total bit yang perlu disisipkan
         total_bits_to_embed = num_header_bits + num_qr_bits
 
-        # 4. Final validation after all processing
-        final_validation = validate_qr_for_image(qr_width, qr_height, cover_width, cover_height)
+        # 4. Final validation: validation_result sudah mencerminkan ukuran QR akhir (setelah resize bila ada)
+        final_validation = validation_result
         if not final_validation['valid']:
             raise ValueError(f"Kapasitas citra tidak cukup bahkan setelah resize. {final_validation['warning']}")
 
-        # Enhanced process information with validation details
-        print(f"[*] ===== INFORMASI PROSES EMBEDDING =====")
-        print(f"[*] Ukuran QR Code: {qr_width}x{qr_height}")
-        if original_qr_size != (qr_width, qr_height):
-            print(f"[*] QR Code diresize dari {original_qr_size[0]}x{original_qr_size[1]} ke {qr_width}x{qr_height}")
-        print(f"[*] Jumlah bit QR Code: {num_qr_bits}")
-        print(f"[*] Jumlah bit Header: {num_header_bits}")
-        print(f"[*] Total bit untuk disisipkan: {total_bits_to_embed}")
-        print(f"[*] Kapasitas citra penampung (Blue channel LSB): {max_capacity} bits")
-        print(f"[*] Penggunaan kapasitas: {final_validation['utilization_percentage']:.1f}%")
-        print(f"[*] Sisa kapasitas: {final_validation['remaining_capacity']} bits")
-        
-        # Additional capacity warnings
+        # Enhanced process information with validation details (string hanya diformat bila verbose)
+        if verbose:
+            log(f"[*] ===== INFORMASI PROSES EMBEDDING =====")
+            log(f"[*] Ukuran QR Code: {qr_width}x{qr_height}")
+            if original_qr_size != (qr_width, qr_height):
+                log(f"[*] QR Code diresize dari {original_qr_size[0]}x{original_qr_size[1]} ke {qr_width}x{qr_height}")
+            log(f"[*] Jumlah bit QR Code: {num_qr_bits}")
+            log(f"[*] Jumlah bit Header: {num_header_bits}")
+            log(f"[*] Total bit untuk disisipkan: {total_bits_to_embed}")
+            if mode_byte:
+                log(f"[*] Mode LSB: {bits_per_channel} bit/channel pada channel {''.join('RGB'[i] for i in channel_indices)}")
+            log(f"[*] Kapasitas citra penampung (Blue channel LSB): {max_capacity} bits")
+            log(f"[*] Penggunaan kapasitas: {final_validation['utilization_percentage']:.1f}%")
+            log(f"[*] Sisa kapasitas: {final_validation['remaining_capacity']} bits")
+        
+        # Additional capacity warnings (peringatan [!] tetap dicetak walau verbose=False)
         if final_validation['utilization_percentage'] > 90:
             print("[!] PERINGATAN: Penggunaan kapasitas sangat tinggi! Kualitas mungkin terpengaruh.")
         elif final_validation['utilization_percentage'] > 75:
             print("[!] PERINGATAN: Penggunaan kapasitas tinggi, monitor hasil dengan seksama.")
         elif final_validation['utilization_percentage'] < 25:
-            print("[*] INFO: Penggunaan kapasitas rendah, QR bisa diperbesar untuk kualitas lebih baik.")
-        
-        print(f"[*] ========================================")
-
-        # 5. Siapkan data untuk disisipkan dan citra output
-        data_bits_iterator = iter(header_bits + qr_bits)  # Iterator untuk bit header + QR
-        stego_img = cover_img.copy()  # Salin citra asli untuk dimodifikasi
-        pixels_processed = 0
-
-        # 6. Proses penyisipan bit ke LSB channel Biru
-        for y in range(cover_height):
-            for x in range(cover_width):
-                try:
-                    # Ambil bit berikutnya dari iterator
-                    bit_to_embed = next(data_bits_iterator)
-                    # Dapatkan nilai RGB piksel saat ini
-                    r, g, b = stego_img.getpixel((x, y))
-                    # Modifikasi hanya channel Biru (b) dengan bit yang akan disisipkan
-                    new_b = _embed_bit(b, bit_to_embed)
-                    # Update piksel di citra stego
-                    stego_img.putpixel((x, y), (r, g, new_b))
-                    pixels_processed += 1
-                except StopIteration:
-                    # Jika iterator habis (semua bit sudah disisipkan)
-                    print(f"[*] Penyisipan selesai. {pixels_processed} piksel dimodifikasi.")
-                    # Simpan stego image dalam format PNG
-                    stego_img.save(output_stego_path, "PNG")
-                    print(f"[*] Stego image disimpan di: {output_stego_path}")
-                    return  # Keluar dari fungsi setelah penyimpanan berhasil
-
-        # Baris ini seharusnya tidak tercapai jika kapasitas cukup
-        print("[!] Warning: Loop selesai tapi tidak semua bit tersisip? Cek logika kapasitas.")
+            log("[*] INFO: Penggunaan kapasitas rendah, QR bisa diperbesar untuk kualitas lebih baik.")
+        
+        log(f"[*] ========================================")
+
+        # 5. Siapkan salinan piksel citra sebagai array
+        if total_bits_to_embed > max_capacity:
+            raise ValueError(f"Kapasitas citra tidak cukup. Dibutuhkan: {total_bits_to_embed} bits, Tersedia: {max_capacity} bits.")
+        stego_arr = np.array(cover_img, dtype=np.uint8)  # Salinan (H, W, 3) yang bisa dimodifikasi
+
+        # 6. Sisipkan bit ke LSB channel Biru dalam urutan baris (sama dengan loop y, x per piksel)
+        # flat[2::3] adalah view channel Biru, jadi penulisan langsung mengubah stego_arr
+        blue = stego_arr.reshape(-1)[2::3]
+        if not mode_byte:
+            n = total_bits_to_embed
+            # Header 5 byte lalu QR terpaket ditulis langsung ke slice blue masing-masing (tanpa
+            # concatenate); aliran bit tetap 1/8 ukuran dan di-unpack per blok di kernel
+            _embed_blue_lsb_packed(blue, header_bytes, num_header_bits)
+            _embed_blue_lsb_packed(blue[num_header_bits:], qr_packed, num_qr_bits)
+        else:
+            # Header tetap di LSB Biru; data QR mengisi channel terpilih mulai piksel setelah header
+            _embed_blue_lsb_packed(blue, header_bytes, num_header_bits)
+            pixels = stego_arr.reshape(-1, 3)[num_header_bits:]
+            _embed_multibit(pixels, qr_bits, bits_per_channel, channel_indices)  # pixels adalah view stego_arr
+            n = num_header_bits + -(-num_qr_bits // bits_per_pixel)
+        log(f"[*] Penyisipan selesai. {n} piksel dimodifikasi.")
+
+        # Simpan stego image dalam format PNG
+        Image.fromarray(stego_arr, 'RGB').save(output_stego_path, "PNG", compress_level=compress_level, optimize=False)
+        log(f"[*] Stego image disimpan di: {output_stego_path}")
 
     # Menangani error spesifik dan umum
     except FileNotFoundError as e:
@@ -424,13 +553,14 @@ def embed_qr_to_image(cover_image_path: str, qr_image_path: str, output_stego_pa
         raise
 
 
-def extract_qr_from_image(stego_image_path: str, output_qr_path: str):
+def extract_qr_from_image(stego_image_path: str, output_qr_path: str, verbose: bool = True):
     """
     Mengekstrak citra QR Code yang tersembunyi dari LSB channel Biru stego image.
 
     Args:
         stego_image_path (str): Path ke stego image (harus PNG).
         output_qr_path (str): Path untuk menyimpan citra QR hasil ekstraksi (akan dibuat PNG).
+        verbose (bool): Jika False, log proses [*] tidak dicetak (peringatan [!] dan pesan error tetap dicetak).
 
     Raises:
         FileNotFoundError: Jika file stego tidak ditemukan.
@@ -438,7 +568,8 @@ def extract_qr_from_image(stego_image_path: str, output_qr_path: str):
         Exception: Jika terjadi error lain selama proses.
     """
 
-    print("[*] Memulai proses extract_qr_from_image")  # Log awal fungsi
+    log = print if verbose else _silent
+    log("[*] Memulai proses extract_qr_from_image")  # Log awal fungsi
 
     # Validasi file input
     if not os.path.exists(stego_image_path):
@@ -450,117 +581,62 @@ def extract_qr_from_image(stego_image_path: str, output_qr_path: str):
 
     try:
         # Buka stego image dalam mode RGB
-        stego_img = Image.open(stego_image_path).convert('RGB')
+        stego_img = _open_image(stego_image_path, 'RGB')
         width, height = stego_img.size
 
-        extracted_bits = ""  # String untuk menampung bit yang diekstrak
-        pixels_processed = 0  # Counter piksel yang diproses
-        header_found = False  # Flag penanda header sudah ditemukan
-        qr_width = 0
-        qr_height = 0
         # Total panjang header = 16 (lebar) + 16 (tinggi) + panjang terminator
-        num_header_bits = 16 + 16 + HEADER_TERMINATOR_LEN
+        num_header_bits = LSB_HEADER_BITS
+
+        # LSB channel Biru dalam urutan baris, langsung dikemas 8 bit/byte (tanpa getpixel per piksel)
+        stego_arr = np.asarray(stego_img, dtype=np.uint8)
+        blue = stego_arr.reshape(-1)[2::3]
 
         # 1. Ekstrak Header (Dimensi QR)
-        print("[*] Mengekstrak header...")
-        # Iterasi piksel stego image
-        for y in range(height):
-            for x in range(width):
-                # Dapatkan nilai RGB
-                r, g, b = stego_img.getpixel((x, y))
-                # Ekstrak LSB dari channel Biru
-                extracted_bits += _extract_lsb(b)
-                pixels_processed += 1
-
-                # Cek apakah sudah cukup bit untuk header + terminator
-                if len(extracted_bits) >= num_header_bits:
-                    # Cek apakah bagian akhir bit cocok dengan terminator
-                    if extracted_bits.endswith(HEADER_TERMINATOR_BIN):
-                        # Ambil bagian header (sebelum terminator)
-                        header_data = extracted_bits[:-HEADER_TERMINATOR_LEN]
-                        # Pastikan panjangnya 32 bit (16+16)
-                        if len(header_data) == 32:
-                            # Konversi bit header ke integer untuk lebar dan tinggi
-                            qr_width = _binary_to_int(header_data[:16])
-                            qr_height = _binary_to_int(header_data[16:])
-                            header_found = True
-                            print(f"[*] Header ditemukan! Dimensi QR: {qr_width}x{qr_height}")
-                            break  # Keluar dari loop x karena header sudah ketemu
-                        else:
-                            # Error jika panjang header tidak sesuai
-                            raise ValueError("Panjang header tidak sesuai setelah terminator ditemukan.")
-                    # Jika bit sudah banyak tapi terminator belum ketemu, mungkin error
-                    elif len(extracted_bits) > num_header_bits + 500:  # Toleransi batas pencarian
-                        raise ValueError("Terminator header tidak ditemukan dalam batas wajar piksel.")
-
-            if header_found:
-                break  # Keluar dari loop y jika header sudah ketemu
-
-        # Jika setelah iterasi seluruh piksel header tidak ditemukan
-        if not header_found:
+        log("[*] Mengekstrak header...")
+        if blue.size < num_header_bits:
             raise ValueError("Gagal menemukan header QR Code dalam citra.")
+        header_bytes = np.empty(num_header_bits // 8, dtype=np.uint8)
+        _extract_blue_lsb_packed(blue, header_bytes, num_header_bits)
+        # Lebar, tinggi, lalu byte terminator: 0 untuk format lama, selain itu mode multi-bit
+        qr_width, qr_height, mode_byte = struct.unpack('>HHB', header_bytes.tobytes())
+        bits_per_channel, channel_indices = _parse_lsb_mode_byte(mode_byte)
+        log(f"[*] Header ditemukan! Dimensi QR: {qr_width}x{qr_height}")
 
         # 2. Hitung jumlah bit QR yang perlu diekstrak berdasarkan dimensi
         num_qr_bits_expected = qr_width * qr_height
         total_bits_expected = num_header_bits + num_qr_bits_expected
 
-        print(f"[*] Jumlah bit QR yang diharapkan: {num_qr_bits_expected}")
-        print(f"[*] Total bit yang diharapkan (header + QR): {total_bits_expected}")
-
-        # 3. Lanjutkan ekstraksi untuk data QR
-        qr_bits_list = []  # List untuk menampung bit QR
-        # Indeks piksel tempat ekstraksi header berhenti
-        start_pixel_index = pixels_processed
-
-        # Konversi indeks piksel linear ke koordinat (x, y) untuk melanjutkan
-        start_y = start_pixel_index // width
-        start_x = start_pixel_index % width
-
-        print(f"[*] Melanjutkan ekstraksi dari piksel ({start_x}, {start_y})")
-
-        # Buat iterator piksel yang dimulai dari piksel setelah header
-        # dan berhenti setelah mengekstrak sejumlah bit yang diperlukan (num_qr_bits_expected)
-        pixel_iterator = itertools.islice(
-            ((x_, y_) for y_ in range(start_y, height) for x_ in range(width) if y_ > start_y or (y_ == start_y and x_ >= start_x)),
-            num_qr_bits_expected
-        )
-
-        bits_extracted_count = 0  # Counter bit QR yang diekstrak
-        # Iterasi menggunakan iterator piksel yang sudah dibuat
-        for x, y in pixel_iterator:
-            r, g, b = stego_img.getpixel((x, y))
-            # Ekstrak LSB dari channel Biru dan tambahkan ke list
-            qr_bits_list.append(_extract_lsb(b))
-            bits_extracted_count += 1
+        log(f"[*] Jumlah bit QR yang diharapkan: {num_qr_bits_expected}")
+        log(f"[*] Total bit yang diharapkan (header + QR): {total_bits_expected}")
+
+        # 3. Ambil bit QR tepat setelah header
+        log(f"[*] Melanjutkan ekstraksi dari piksel ({num_header_bits % width}, {num_header_bits // width})")
+        if not mode_byte:
+            # Hanya piksel yang memuat header + QR yang dibaca, hasilnya terpaket lalu di-unpack sekali
+            n = min(total_bits_expected, blue.size)
+            lsb_packed = np.empty((n + 7) // 8, dtype=np.uint8)
+            _extract_blue_lsb_packed(blue, lsb_packed, n)
+            qr_bits = np.unpackbits(lsb_packed[num_header_bits // 8:], count=n - num_header_bits)
+        else:
+            log(f"[*] Mode LSB: {bits_per_channel} bit/channel pada channel {''.join('RGB'[i] for i in channel_indices)}")
+            pixels = stego_arr.reshape(-1, 3)[num_header_bits:]
+            qr_bits = _extract_multibit(pixels, num_qr_bits_expected, bits_per_channel, channel_indices)
+        bits_extracted_count = qr_bits.size
 
-        print(f"[*] Jumlah bit QR yang berhasil diekstrak: {bits_extracted_count}")
+        log(f"[*] Jumlah bit QR yang berhasil diekstrak: {bits_extracted_count}")
 
         # Cek apakah jumlah bit yang diekstrak sesuai harapan
         if bits_extracted_count < num_qr_bits_expected:
             raise ValueError(f"Data tidak cukup. Hanya {bits_extracted_count} dari {num_qr_bits_expected} bit QR yang bisa diekstrak.")
 
-        # Gabungkan list bit menjadi satu string
-        qr_bits = "".join(qr_bits_list)
-
         # 4. Rekonstruksi citra QR Code dari aliran bit
-        print("[*] Merekonstruksi citra QR Code...")
-        # Buat citra baru mode '1' (hitam/putih) dengan dimensi yang didapat dari header
-        reconstructed_qr = Image.new('1', (qr_width, qr_height))
-        bit_index = 0
-        # Iterasi koordinat citra QR yang akan dibuat
-        for y in range(qr_height):
-            for x in range(qr_width):
-                # Jika bit = '1' (representasi hitam), set piksel ke 0 (hitam di mode '1')
-                if qr_bits[bit_index] == '1':
-                    reconstructed_qr.putpixel((x, y), 0)
-                # Jika bit = '0' (representasi putih), set piksel ke 255 (putih di mode '1')
-                else:
-                    reconstructed_qr.putpixel((x, y), 255)
-                bit_index += 1
+        log("[*] Merekonstruksi citra QR Code...")
+        # Bit 1 = hitam (0), bit 0 = putih (255); array boolean menjadi citra mode '1' (True = putih)
+        reconstructed_qr = Image.fromarray(qr_bits.reshape(qr_height, qr_width) == 0)
 
         # Simpan citra QR hasil rekonstruksi
-        reconstructed_qr.save(output_qr_path, "PNG")
-        print(f"[*] Citra QR Code hasil ekstraksi disimpan di: {output_qr_path}")
+        reconstructed_qr.save(output_qr_path, "PNG", compress_level=PNG_COMPRESS_LEVEL, optimize=False)
+        log(f"[*] Citra QR Code hasil ekstraksi disimpan di: {output_qr_path}")
 
     # Menangani error spesifik dan umum
     except FileNotFoundError as e:
@@ -833,7 +909,7 @@ def embed_secure_qr_to_image(cover_path: str, encrypted_qr_data: str, key_hash:
             raise ValueError("Output file must be PNG format for LSB integrity")
         
         # Load cover image
-        cover_img = Image.open(cover_path).convert('RGB')
+        cover_img = _open_image(cover_path, 'RGB')
         cover_width, cover_height = cover_img.size
         max_capacity = cover_width * cover_height
         
@@ -855,24 +931,32 @@ def embed_secure_qr_to_image(cover_path: str, encrypted_qr_data: str, key_hash:
         print(f"[*] Generated QR code: {qr_width}x{qr_height}")
         print(f"[*] Cover image capacity: {max_capacity} bits")
         
-        # Convert QR to 1-bit mode and create bit stream
+        # Convert QR to 1-bit mode and create bit stream (1 = black), unpacked from the packed
+        # mode '1' rows; the '0'/'1' string form is kept only for the header checksum
         qr_img_1bit = qr_img.convert('1')
-        qr_bits = "".join(['1' if qr_img_1bit.getpixel((x, y)) == 0 else '0'
-                          for y in range(qr_height) for x in range(qr_width)])
+        row_bytes = (qr_width + 7) // 8
+        qr_packed = np.frombuffer(qr_img_1bit.tobytes(), dtype=np.uint8).reshape(qr_height, row_bytes)
+        qr_bit_array = np.unpackbits(qr_packed, axis=1, count=qr_width).ravel()
+        qr_bit_array ^= 1
+        qr_bits = (qr_bit_array + ord('0')).tobytes().decode('ascii')
         
         # Generate security header
         current_timestamp = str(int(time.time()))
         security_header = add_security_header(qr_bits, key_hash, current_timestamp)
         
-        # Create enhanced header: security_header + standard_header + terminator
-        standard_header = _int_to_binary(qr_width, 16) + _int_to_binary(qr_height, 16)
-        enhanced_header = security_header + standard_header + HEADER_TERMINATOR_BIN
+        # Create enhanced header: security_header + standard_header + terminator.
+        # Standard header is packed directly as bytes: 16-bit width, 16-bit height, zero terminator
+        standard_header_bytes = struct.pack('>HHB', qr_width, qr_height, 0)
+        enhanced_header_bits = np.concatenate((
+            np.frombuffer(security_header.encode('ascii'), dtype=np.uint8) - ord('0'),
+            np.unpackbits(np.frombuffer(standard_header_bytes, dtype=np.uint8))
+        ))
         
         # Calculate total bits needed
         security_header_length = len(security_header)
-        standard_header_length = len(standard_header) + len(HEADER_TERMINATOR_BIN)
-        total_header_length = len(enhanced_header)
-        qr_bits_length = len(qr_bits)
+        standard_header_length = len(standard_header_bytes) * 8
+        total_header_length = enhanced_header_bits.size
+        qr_bits_length = qr_bit_array.size
         total_bits_needed = total_header_length + qr_bits_length
         
         print(f"[*] Security header: {security_header_length} bits")
@@ -887,28 +971,19 @@ def embed_secure_qr_to_image(cover_path: str, encrypted_qr_data: str, key_hash:
         utilization_percentage = (total_bits_needed / max_capacity) * 100
         print(f"[*] Capacity utilization: {utilization_percentage:.1f}%")
         
-        # Embed data using LSB
-        data_bits_iterator = iter(enhanced_header + qr_bits)
-        stego_img = cover_img.copy()
-        pixels_processed = 0
+        # Embed data using LSB: np.array() is the single copy of the pixels (RGB, blue at offset 2);
+        # header and QR bits are written straight into their blue slices (no concatenated bit stream),
+        # then one fromarray() for saving (no PIL copy/putpixel)
+        stego_arr = np.array(cover_img, dtype=np.uint8)
         
         print("[*] Embedding secure QR with security header...")
-        for y in range(cover_height):
-            for x in range(cover_width):
-                try:
-                    bit_to_embed = next(data_bits_iterator)
-                    r, g, b = stego_img.getpixel((x, y))
-                    new_b = _embed_bit(b, bit_to_embed)
-                    stego_img.putpixel((x, y), (r, g, new_b))
-                    pixels_processed += 1
-                except StopIteration:
-                    break
-            else:
-                continue
-            break
+        blue = stego_arr.reshape(-1)[2::3]
+        _embed_blue_lsb(blue, enhanced_header_bits)
+        _embed_blue_lsb(blue[total_header_length:], qr_bit_array)
+        pixels_processed = total_bits_needed
         
         # Save stego image
-        stego_img.save(output_path, "PNG")
+        Image.fromarray(stego_arr, 'RGB').save(output_path, "PNG", compress_level=PNG_COMPRESS_LEVEL, optimize=False)
         print(f"[*] Secure stego image saved: {output_path}")
         
         # Prepare security metadata for response
@@ -961,14 +1036,18 @@ def extract_secure_qr_from_image(stego_path: str, document_key: str, output_path
             raise FileNotFoundError(f"Stego image not found: {stego_path}")
         
         # Load stego image
-        stego_img = Image.open(stego_path).convert('RGB')
+        stego_img = _open_image(stego_path, 'RGB')
         width, height = stego_img.size
         
         print(f"[*] Processing stego image: {width}x{height}")
         
-        # Extract bits from LSB of blue channel
-        extracted_bits = ""
-        pixels_processed = 0
+        # Extract bits from LSB of blue channel in one pass, as ASCII '0'/'1' bytes
+        # (no per-pixel getpixel calls or string concatenation). getchannel('B') splits the band
+        # in C, so only a contiguous 1-byte/pixel buffer is materialised instead of the full RGB copy.
+        blue = np.asarray(stego_img.getchannel('B'), dtype=np.uint8).reshape(-1)
+        lsb_bits = np.empty(blue.size, dtype=np.uint8)
+        _extract_blue_lsb(blue, lsb_bits, blue.size)
+        bit_chars = (lsb_bits + ord('0')).tobytes()
         
         # First, extract enough bits for security header (80 bits)
         SECURITY_HEADER_LENGTH = 80
@@ -978,16 +1057,8 @@ def extract_secure_qr_from_image(stego_path: str, document_key: str, output_path
         
         # Extract bits for security + standard header + some QR data
         extraction_limit = SECURITY_HEADER_LENGTH + STANDARD_HEADER_LENGTH + 1000  # Extra for QR data
-        
-        for y in range(height):
-            for x in range(width):
-                if len(extracted_bits) >= extraction_limit:
-                    break
-                r, g, b = stego_img.getpixel((x, y))
-                extracted_bits += _extract_lsb(b)
-                pixels_processed += 1
-            if len(extracted_bits) >= extraction_limit:
-                break
+        extracted_bits = bit_chars[:extraction_limit].decode('ascii')
+        pixels_processed = len(extracted_bits)
         
         print(f"[*] Extracted {len(extracted_bits)} bits for analysis")
         
@@ -1006,25 +1077,15 @@ def extract_secure_qr_from_image(stego_path: str, document_key: str, output_path
         standard_header_start = SECURITY_HEADER_LENGTH
         standard_header_bits = extracted_bits[standard_header_start:]
         
-        # Find terminator in standard header
-        terminator_found = False
-        qr_width = 0
-        qr_height = 0
-        
-        for i in range(len(standard_header_bits) - len(HEADER_TERMINATOR_BIN) + 1):
-            if standard_header_bits[i:i + len(HEADER_TERMINATOR_BIN)] == HEADER_TERMINATOR_BIN:
-                # Found terminator, extract width and height
-                header_data = standard_header_bits[:i]
-                if len(header_data) >= 32:
-                    qr_width = _binary_to_int(header_data[:16])
-                    qr_height = _binary_to_int(header_data[16:32])
-                    terminator_found = True
-                    print(f"[*] QR dimensions from header: {qr_width}x{qr_height}")
-                    break
-        
-        if not terminator_found:
+        # Standard header has a fixed layout (16-bit width, 16-bit height, terminator),
+        # so the terminator is checked at its known offset instead of scanned for
+        if standard_header_bits[32:STANDARD_HEADER_LENGTH] != HEADER_TERMINATOR_BIN:
             raise ValueError("Could not find standard header terminator")
         
+        dimension_bytes = np.packbits(lsb_bits[SECURITY_HEADER_LENGTH:SECURITY_HEADER_LENGTH + 32]).tobytes()
+        qr_width, qr_height = struct.unpack('>HH', dimension_bytes)
+        print(f"[*] QR dimensions from header: {qr_width}x{qr_height}")
+        
         # Calculate total bits needed for complete extraction
         qr_bits_needed = qr_width * qr_height
         total_header_length = SECURITY_HEADER_LENGTH + 32 + len(HEADER_TERMINATOR_BIN)
@@ -1033,41 +1094,27 @@ def extract_secure_qr_from_image(stego_path: str, document_key: str, output_path
         print(f"[*] Need {total_bits_needed} total bits ({qr_bits_needed} for QR data)")
         
         # Extract remaining bits if needed
-        while len(extracted_bits) < total_bits_needed:
-            if pixels_processed >= width * height:
-                break
-            y = pixels_processed // width
-            x = pixels_processed % width
-            r, g, b = stego_img.getpixel((x, y))
-            extracted_bits += _extract_lsb(b)
-            pixels_processed += 1
+        if len(extracted_bits) < total_bits_needed:
+            extracted_bits = bit_chars[:total_bits_needed].decode('ascii')
+            pixels_processed = len(extracted_bits)
         
         if len(extracted_bits) < total_bits_needed:
             raise ValueError(f"Insufficient data. Need {total_bits_needed}, got {len(extracted_bits)}")
         
-        # Extract QR bits
+        # Extract QR bits straight from the LSB array (no '0'/'1' string round trip)
         qr_bits_start = total_header_length
-        qr_bits = extracted_bits[qr_bits_start:qr_bits_start + qr_bits_needed]
-        
-        print(f"[*] Extracted {len(qr_bits)} QR bits")
+        qr_bits = lsb_bits[qr_bits_start:qr_bits_start + qr_bits_needed]
         
-        # Reconstruct QR image
-        reconstructed_qr = Image.new('1', (qr_width, qr_height))
-        bit_index = 0
+        print(f"[*] Extracted {qr_bits.size} QR bits")
         
-        for y in range(qr_height):
-            for x in range(qr_width):
-                if qr_bits[bit_index] == '1':
-                    reconstructed_qr.putpixel((x, y), 0)  # Black
-                else:
-                    reconstructed_qr.putpixel((x, y), 255)  # White
-                bit_index += 1
+        # Reconstruct QR image: bit 1 = black, 0 = white; a boolean array becomes mode '1' (True = white)
+        reconstructed_qr = Image.fromarray(qr_bits.reshape(qr_height, qr_width) == 0)
         
         # Save extracted QR
         if not output_path.lower().endswith('.png'):
             output_path = os.path.splitext(output_path)[0] + ".png"
         
-        reconstructed_qr.save(output_path, "PNG")
+        reconstructed_qr.save(output_path, "PNG", compress_level=PNG_COMPRESS_LEVEL, optimize=False)
         print(f"[*] Extracted QR saved: {output_path}")
         
         # Try to read QR data
@@ -1115,20 +1162,9 @@ def _calculate_crc16(data: bytes) -> int:
     Returns:
         int: 16-bit CRC checksum
     """
-    # Simple CRC-16 implementation
-    crc = 0xFFFF
-    polynomial = 0x1021
-    
-    for byte in data:
-        crc ^= (byte << 8)
-        for _ in range(8):
-            if crc & 0x8000:
-                crc = (crc << 1) ^ polynomial
-            else:
-                crc <<= 1
-            crc &= 0xFFFF
-    
-    return crc
+    # CRC-16/CCITT (polinom 0x1021, init 0xFFFF, MSB dulu): binascii.crc_hqx menghitung CRC yang
+    # sama di C dengan tabel, bukan 8 shift/XOR Python per byte
+    return binascii.crc_hqx(data, 0xFFFF)
 
 
 # Enhanced versions of existing functions with optional security mode
@@ -14,14 +14,14 @@ from qr_utils import (generate_qr, read_qr, analyze_text_encoding,
                       calculate_qr_capacity, get_optimal_qr_version, 
                       compare_qr_configurations, generate_qr_advanced,
                       generate_secure_qr, read_secure_qr, validate_qr_security)
-from lsb_steganography import embed_qr_to_image, extract_qr_from_image
+from lsb_steganography import embed_qr_to_image, extract_qr_from_image, PNG_COMPRESS_LEVEL
 
 # Import security utilities
 import security_utils
 
 
-def parse_arguments():
-    """Parse command line arguments."""
+def parse_arguments(argv: List[str] = None):
+    """Parse command line arguments (default: sys.argv; argv bisa diisi saat dipanggil dari app.py)."""
     parser = argparse.ArgumentParser(
         description='QR Code Watermarking tools menggunakan LSB steganography',
         formatter_class=argparse.RawTextHelpFormatter
@@ -87,7 +87,7 @@ def parse_arguments():
     validate_security_parser.add_argument('--detailed', action='store_true',
                                          help='Show detailed validation report')
 
-    return parser.parse_args()
+    return parser.parse_args(argv)
 
 
 def analyze_qr_options(data: str, target_image_sizes: list = None) -> dict:
@@ -397,7 +397,7 @@ def extract_images_from_pdf(pdf_path: str, output_dir: str) -> List[str]:
                     image = Image.open(BytesIO(image_bytes))
                     image_filename = f"image_{image_count}.png"
                     image_path = os.path.join(output_dir, image_filename)
-                    image.save(image_path, "PNG")
+                    image.save(image_path, "PNG", compress_level=PNG_COMPRESS_LEVEL, optimize=False)
                 else:
                     # Save directly as PNG
                     image_filename = f"image_{image_count}.png"
@@ -906,7 +906,8 @@ def embed_watermark_to_docx(docx_path: str, qr_path: str, output_path: str, vali
         document_key: Document security key for validation (optional)
 
     Returns:
-        dict: Result dictionary with success status and processed image info
+        dict: Result dictionary with success status and processed image info.
+              "qr_pil" holds the loaded QR PIL.Image so callers can decode it without re-reading the file.
     """
     try:
         # Security validation if requested
@@ -1019,7 +1020,7 @@ def embed_watermark_to_docx(docx_path: str, qr_path: str, output_path: str, vali
             
             try:
                 # Perform the watermarking
-                embed_qr_to_image(img_path, qr_path, watermarked_path, resize_qr_if_needed=True)
+                embed_qr_to_image(img_path, qr_path, watermarked_path, resize_qr_if_needed=True, verbose=False)
                 watermarked_images.append(watermarked_path)
                 
                 # Copy watermarked image to public directory
@@ -1061,10 +1062,12 @@ def embed_watermark_to_docx(docx_path: str, qr_path: str, output_path: str, vali
         qr_public_path = os.path.join(public_dir, qr_public_name)
         shutil.copy(qr_path, qr_public_path)
 
-        # Get QR code dimensions
+        # Get QR code dimensions (citra QR tetap dimuat agar pemanggil bisa langsung men-decode-nya)
+        qr_pil = None
         try:
-            qr_img = Image.open(qr_path)
-            qr_width, qr_height = qr_img.size
+            qr_pil = Image.open(qr_path)
+            qr_pil.load()
+            qr_width, qr_height = qr_pil.size
             qr_info = {
                 "width": qr_width,
                 "height": qr_height
@@ -1079,7 +1082,8 @@ def embed_watermark_to_docx(docx_path: str, qr_path: str, output_path: str, vali
             "processed_images": processed_images,
             "qr_image": f"{public_dir_name}/{qr_public_name}",
             "public_dir": public_dir_name,
-            "qr_info": qr_info
+            "qr_info": qr_info,
+            "qr_pil": qr_pil
         }
         
     except ValueError as ve:
@@ -1105,7 +1109,8 @@ def embed_watermark_to_pdf(pdf_path: str, qr_path: str, output_path: str, valida
         document_key: Document security key for validation (optional)
 
     Returns:
-        dict: Result dictionary with success status and processed image info
+        dict: Result dictionary with success status and processed image info.
+              "qr_pil" holds the loaded QR PIL.Image so callers can decode it without re-reading the file.
     """
     try:
         # Security validation if requested
@@ -1217,7 +1222,7 @@ def embed_watermark_to_pdf(pdf_path: str, qr_path: str, output_path: str, valida
             
             try:
                 # Perform the watermarking
-                embed_qr_to_image(img_path, qr_path, watermarked_path, resize_qr_if_needed=True)
+                embed_qr_to_image(img_path, qr_path, watermarked_path, resize_qr_if_needed=True, verbose=False)
                 watermarked_images.append(watermarked_path)
                 
                 # Copy watermarked image to public directory
@@ -1259,10 +1264,12 @@ def embed_watermark_to_pdf(pdf_path: str, qr_path: str, output_path: str, valida
         qr_public_path = os.path.join(public_dir, qr_public_name)
         shutil.copy(qr_path, qr_public_path)
 
-        # Get QR code dimensions
+        # Get QR code dimensions (citra QR tetap dimuat agar pemanggil bisa langsung men-decode-nya)
+        qr_pil = None
         try:
-            qr_img = Image.open(qr_path)
-            qr_width, qr_height = qr_img.size
+            qr_pil = Image.open(qr_path)
+            qr_pil.load()
+            qr_width, qr_height = qr_pil.size
             qr_info = {
                 "width": qr_width,
                 "height": qr_height
@@ -1277,7 +1284,8 @@ def embed_watermark_to_pdf(pdf_path: str, qr_path: str, output_path: str, valida
             "processed_images": processed_images,
             "qr_image": f"{public_dir_name}/{qr_public_name}",
             "public_dir": public_dir_name,
-            "qr_info": qr_info
+            "qr_info": qr_info,
+            "qr_pil": qr_pil
         }
         
     except ValueError as ve:
@@ -1291,7 +1299,7 @@ def embed_watermark_to_pdf(pdf_path: str, qr_path: str, output_path: str, valida
         return {"success": False, "error": str(e)}
 
 
-def extract_watermark_from_docx(docx_path: str, output_dir: str, validate_security: bool = False, document_key: str = None) -> bool:
+def extract_watermark_from_docx(docx_path: str, output_dir: str, validate_security: bool = False, document_key: str = None) -> dict:
     """
     Extract QR watermarks from images in a docx document.
 
@@ -1302,8 +1310,10 @@ def extract_watermark_from_docx(docx_path: str, output_dir: str, validate_securi
         document_key: Document security key for validation (optional)
 
     Returns:
-        bool: True if any watermarks were extracted, False otherwise
+        dict: {"success": True if any watermarks were extracted, "extracted_files": list of the
+              QR image paths written to output_dir}
     """
+    extracted_files = []
     try:
         # Make sure the output directory exists
         os.makedirs(output_dir, exist_ok=True)
@@ -1342,8 +1352,9 @@ def extract_watermark_from_docx(docx_path: str, output_dir: str, validate_securi
             qr_output_path = os.path.join(output_dir, f"extracted_qr_{i}.png")
 
             try:
-                extract_qr_from_image(img_path, qr_output_path)
+                extract_qr_from_image(img_path, qr_output_path, verbose=False)
                 qr_found = True
+                extracted_files.append(qr_output_path)
 
                 # Try to read the QR to verify it's valid
                 try:
@@ -1370,19 +1381,19 @@ def extract_watermark_from_docx(docx_path: str, output_dir: str, validate_securi
             except Exception as e:
                 print(f"[!] Warning: Tidak dapat menghapus direktori temp: {str(e)}")
 
-        return qr_found
+        return {"success": qr_found, "extracted_files": extracted_files}
     except ValueError as ve:
         if str(ve) == "NO_IMAGES_FOUND":
             # Propagate the specific error
             raise ve
         print(f"[!] Error saat proses ekstraksi watermark: {str(ve)}")
-        return False
+        return {"success": False, "extracted_files": extracted_files}
     except Exception as e:
         print(f"[!] Error saat proses ekstraksi watermark: {str(e)}")
-        return False
+        return {"success": False, "extracted_files": extracted_files}
 
 
-def extract_watermark_from_pdf(pdf_path: str, output_dir: str) -> bool:
+def extract_watermark_from_pdf(pdf_path: str, output_dir: str) -> dict:
     """
     Extract QR watermarks from images in a PDF document.
 
@@ -1391,8 +1402,10 @@ def extract_watermark_from_pdf(pdf_path: str, output_dir: str) -> bool:
         output_dir: Directory to save extracted QR codes
 
     Returns:
-        bool: True if any watermarks were extracted, False otherwise
+        dict: {"success": True if any watermarks were extracted, "extracted_files": list of the
+              QR image paths written to output_dir}
     """
+    extracted_files = []
     try:
         # Make sure the output directory exists
         os.makedirs(output_dir, exist_ok=True)
@@ -1424,8 +1437,9 @@ def extract_watermark_from_pdf(pdf_path: str, output_dir: str) -> bool:
             qr_output_path = os.path.join(output_dir, f"extracted_qr_{i}.png")
 
             try:
-                extract_qr_from_image(img_path, qr_output_path)
+                extract_qr_from_image(img_path, qr_output_path, verbose=False)
                 qr_found = True
+                extracted_files.append(qr_output_path)
 
                 # Try to read the QR to verify it's valid
                 try:
@@ -1452,83 +1466,82 @@ def extract_watermark_from_pdf(pdf_path: str, output_dir: str) -> bool:
             except Exception as e:
                 print(f"[!] Warning: Tidak dapat menghapus direktori temp: {str(e)}")
 
-        return qr_found
+        return {"success": qr_found, "extracted_files": extracted_files}
     except ValueError as ve:
         if str(ve) == "NO_IMAGES_FOUND":
             # Propagate the specific error
             raise ve
         print(f"[!] Error saat proses ekstraksi watermark dari PDF: {str(ve)}")
-        return False
+        return {"success": False, "extracted_files": extracted_files}
     except Exception as e:
         print(f"[!] Error saat proses ekstraksi watermark dari PDF: {str(e)}")
-        return False
+        return {"success": False, "extracted_files": extracted_files}
+
+
+def _command_generate_qr(args):
+    # Handle the new QR generation arguments
+    return generate_qr_code(
+        data=args.data,
+        output_path=args.output,
+        version=getattr(args, 'version', None),
+        error_correction=getattr(args, 'error_correction', 'M'),
+        box_size=getattr(args, 'box_size', 10),
+        border=getattr(args, 'border', 4),
+        analyze=getattr(args, 'analyze', False),
+        secure=getattr(args, 'secure', False),
+        document_path=getattr(args, 'document_path', None)
+    )
 
 
-def main():
-    """Main entry point for the CLI script."""
-    args = parse_arguments()
+def _command_generate_key(args):
+    # NEW: Generate document security key
+    return generate_document_key_command(
+        document_path=args.document,
+        additional_data=getattr(args, 'additional_data', ''),
+        save_key_path=getattr(args, 'save_key', None)
+    )
 
-    if args.command == 'generate_qr':
-        # Handle the new QR generation arguments
-        version = getattr(args, 'version', None)
-        error_correction = getattr(args, 'error_correction', 'M')
-        box_size = getattr(args, 'box_size', 10)
-        border = getattr(args, 'border', 4)
-        analyze = getattr(args, 'analyze', False)
-        secure = getattr(args, 'secure', False)
-        document_path = getattr(args, 'document_path', None)
-        
-        generate_qr_code(
-            data=args.data,
-            output_path=args.output,
-            version=version,
-            error_correction=error_correction,
-            box_size=box_size,
-            border=border,
-            analyze=analyze,
-            secure=secure,
-            document_path=document_path
-        )
 
-    elif args.command == 'generate_key':
-        # NEW: Generate document security key
-        additional_data = getattr(args, 'additional_data', '')
-        save_key_path = getattr(args, 'save_key', None)
-        
-        generate_document_key_command(
-            document_path=args.document,
-            additional_data=additional_data,
-            save_key_path=save_key_path
-        )
+def _command_validate_security(args):
+    # NEW: Validate QR-document security pairing
+    return validate_qr_document_pair(
+        qr_image_path=args.qr_image,
+        document_path=args.document,
+        document_key=getattr(args, 'key', None),
+        detailed=getattr(args, 'detailed', False)
+    )
 
-    elif args.command == 'validate_security':
-        # NEW: Validate QR-document security pairing
-        document_key = getattr(args, 'key', None)
-        detailed = getattr(args, 'detailed', False)
-        
-        validate_qr_document_pair(
-            qr_image_path=args.qr_image,
-            document_path=args.document,
-            document_key=document_key,
-            detailed=detailed
-        )
 
-    elif args.command == 'embed_docx':
-        embed_watermark_to_docx(args.docx, args.qr, args.output)
+# Tabel dispatch perintah CLI -> handler; dipakai oleh main() dan run_main_script di app.py
+COMMAND_HANDLERS = {
+    'generate_qr': _command_generate_qr,
+    'generate_key': _command_generate_key,
+    'validate_security': _command_validate_security,
+    'embed_docx': lambda args: embed_watermark_to_docx(args.docx, args.qr, args.output),
+    'embed_pdf': lambda args: embed_watermark_to_pdf(args.pdf, args.qr, args.output),
+    'extract_docx': lambda args: extract_watermark_from_docx(args.docx, args.output_dir),
+    'extract_pdf': lambda args: extract_watermark_from_pdf(args.pdf, args.output_dir),
+}
+
 
-    elif args.command == 'embed_pdf':
-        embed_watermark_to_pdf(args.pdf, args.qr, args.output)
+def main(argv: List[str] = None):
+    """Main entry point for the CLI script.
 
-    elif args.command == 'extract_docx':
-        extract_watermark_from_docx(args.docx, args.output_dir)
+    Args:
+        argv: Daftar argumen (tanpa nama program). None berarti memakai sys.argv.
 
-    elif args.command == 'extract_pdf':
-        extract_watermark_from_pdf(args.pdf, args.output_dir)
+    Returns:
+        Nilai kembalian handler perintah yang dijalankan.
+    """
+    args = parse_arguments(argv)
 
-    else:
+    handler = COMMAND_HANDLERS.get(args.command)
+    if handler is None:
         print("Perintah tidak dikenal. Gunakan --help untuk bantuan.")
         sys.exit(1)
 
+    return handler(args)
+
 
 if __name__ == "__main__":
     main()
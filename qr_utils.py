@@ -3,10 +3,14 @@
 
 import qrcode
 import cv2
+import numpy as np
 from PIL import Image
 import os
 import json
 import time
+import hashlib
+import threading
+from collections import OrderedDict
 from datetime import datetime
 from typing import Optional, Dict, Any
 
@@ -46,6 +50,11 @@ def generate_qr(data: str, output_path: str):
         print(f"[!] Error saat membuat QR Code: {e}")
         raise # Melempar kembali error untuk ditangani di level lebih tinggi jika perlu
 
+# Cache LRU hasil read_qr: blake2b (16 byte) isi file -> tuple data QR
+QR_DECODE_CACHE_SIZE = 256
+_qr_decode_cache = OrderedDict()
+_qr_decode_cache_lock = threading.Lock()
+
 def read_qr(image_path: str) -> list[str]:
     """
     Membaca data dari sebuah citra QR Code menggunakan OpenCV.
@@ -66,37 +75,80 @@ def read_qr(image_path: str) -> list[str]:
         raise FileNotFoundError(f"File tidak ditemukan: {image_path}")
 
     try:
-        # Membaca citra menggunakan OpenCV
-        img = cv2.imread(image_path)
+        with open(image_path, 'rb') as f:
+            data = f.read()
+
+        # QR yang sama sering diunggah ulang untuk beberapa dokumen; hasil decode di-cache
+        # berdasarkan hash isi file sehingga deteksi OpenCV hanya dijalankan saat cache miss
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        with _qr_decode_cache_lock:
+            cached = _qr_decode_cache.get(digest)
+            if cached is not None:
+                _qr_decode_cache.move_to_end(digest)
+                return list(cached)
+
+        # Men-decode citra dari byte yang sudah dibaca (tanpa membaca file kedua kali)
+        img = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
         if img is None:
             raise ValueError(f"Gagal membaca citra: {image_path}")
 
-        # Inisialisasi QR code detector
-        qr_detector = cv2.QRCodeDetector()
-        
-        # Membaca QR code dari citra
-        # retval: bool (berhasil/tidak)
-        # decoded_info: string (data QR code)
-        # points: numpy.ndarray (koordinat QR code)
-        # straight_qrcode: numpy.ndarray (citra QR code yang telah diluruskan)
-        retval, decoded_info, points, straight_qrcode = qr_detector.detectAndDecodeMulti(img)
-        
-        # Jika QR code terdeteksi
-        if retval:
-            # Filter out empty strings and convert to list
-            data_list = [text for text in decoded_info if text]
-        else:
-            data_list = []
-
-        # Memberi informasi jika tidak ada QR Code yang terdeteksi
-        if not data_list:
-            print(f"[!] Tidak ada QR Code yang terdeteksi di: {image_path}")
+        data_list = _decode_qr_array(img, image_path)
+        with _qr_decode_cache_lock:
+            _qr_decode_cache[digest] = tuple(data_list)
+            if len(_qr_decode_cache) > QR_DECODE_CACHE_SIZE:
+                _qr_decode_cache.popitem(last=False)
         return data_list
     except Exception as e:
         # Menangani potensi error saat membuka citra atau proses decoding
         print(f"[!] Error saat membaca QR Code: {e}")
         raise # Melempar kembali error
 
+def read_qr_from_image(pil_img: Image.Image) -> list[str]:
+    """
+    Membaca data QR Code dari citra PIL yang sudah ada di memori.
+
+    Sama seperti read_qr, tetapi tanpa membaca dan men-decode ulang file PNG dari disk.
+
+    Args:
+        pil_img (PIL.Image.Image): Citra QR Code (mode apa pun, mis. '1', 'L', atau 'RGB').
+
+    Returns:
+        list[str]: List berisi data yang berhasil dibaca. List bisa kosong.
+    """
+    try:
+        # QRCodeDetector menerima citra grayscale 8-bit secara langsung
+        if pil_img.mode != 'L':
+            pil_img = pil_img.convert('L')
+        img = np.asarray(pil_img)
+        return _decode_qr_array(img, "<citra di memori>")
+    except Exception as e:
+        print(f"[!] Error saat membaca QR Code: {e}")
+        raise
+
+def _decode_qr_array(img: np.ndarray, source: str) -> list[str]:
+    """Men-decode semua QR Code dari array citra OpenCV (BGR atau grayscale)."""
+    # Inisialisasi QR code detector
+    qr_detector = cv2.QRCodeDetector()
+
+    # Membaca QR code dari citra
+    # retval: bool (berhasil/tidak)
+    # decoded_info: string (data QR code)
+    # points: numpy.ndarray (koordinat QR code)
+    # straight_qrcode: numpy.ndarray (citra QR code yang telah diluruskan)
+    retval, decoded_info, points, straight_qrcode = qr_detector.detectAndDecodeMulti(img)
+
+    # Jika QR code terdeteksi
+    if retval:
+        # Filter out empty strings and convert to list
+        data_list = [text for text in decoded_info if text]
+    else:
+        data_list = []
+
+    # Memberi informasi jika tidak ada QR Code yang terdeteksi
+    if not data_list:
+        print(f"[!] Tidak ada QR Code yang terdeteksi di: {source}")
+    return data_list
+
 # Advanced QR Code Configuration Functions
 
 def analyze_text_encoding(text: str) -> str:
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Round-trip test mode LSB multi-bit (bits_per_channel x channels) di lsb_steganography,
+plus kompatibilitas stego image format lama (1 bit LSB channel Biru, byte mode 0).
+"""
+import os
+import struct
+import tempfile
+from itertools import combinations
+
+import numpy as np
+from PIL import Image
+
+from lsb_steganography import (embed_qr_to_image, extract_qr_from_image, MAX_BITS_PER_CHANNEL,
+                               _lsb_mode_byte, _parse_lsb_mode_byte)
+
+COVER_SIZE = (64, 48)  # (lebar, tinggi): 3072 piksel
+QR_SIZE = (50, 50)     # 2500 bit, muat di mode lama
+
+ALL_CHANNELS = [combo for n in range(1, 4) for combo in combinations('RGB', n)]
+
+
+def _make_images(workdir, qr_size=QR_SIZE, seed=0):
+    """Tulis cover RGB acak dan QR hitam-putih acak; kembalikan (cover_path, qr_path, qr_black)."""
+    rng = np.random.default_rng(seed)
+    cover = rng.integers(0, 256, size=(COVER_SIZE[1], COVER_SIZE[0], 3), dtype=np.uint8)
+    qr_black = rng.integers(0, 2, size=(qr_size[1], qr_size[0])).astype(bool)
+    cover_path = os.path.join(workdir, 'cover.png')
+    qr_path = os.path.join(workdir, 'qr.png')
+    Image.fromarray(cover, 'RGB').save(cover_path)
+    Image.fromarray(np.where(qr_black, 0, 255).astype(np.uint8), 'L').save(qr_path)
+    return cover_path, qr_path, qr_black
+
+
+def _extracted_black(path):
+    return np.asarray(Image.open(path).convert('L')) == 0
+
+
+def _round_trip(bits_per_channel, channels, qr_size=QR_SIZE):
+    with tempfile.TemporaryDirectory() as workdir:
+        cover_path, qr_path, qr_black = _make_images(workdir, qr_size)
+        stego_path = os.path.join(workdir, 'stego.png')
+        extracted_path = os.path.join(workdir, 'extracted.png')
+        embed_qr_to_image(cover_path, qr_path, stego_path, resize_qr_if_needed=False,
+                          bits_per_channel=bits_per_channel, channels=channels, verbose=False)
+        extract_qr_from_image(stego_path, extracted_path, verbose=False)
+        assert np.array_equal(_extracted_black(extracted_path), qr_black), (bits_per_channel, channels)
+
+        # Bit di atas bits_per_channel dan channel yang tidak dipakai tidak boleh berubah
+        cover = np.asarray(Image.open(cover_path)).reshape(-1, 3)
+        stego = np.asarray(Image.open(stego_path)).reshape(-1, 3)
+        keep = np.full(3, 0xFF, dtype=np.uint8)
+        for ch in channels:
+            keep['RGB'.index(ch)] = 0xFF ^ ((1 << bits_per_channel) - 1)
+        keep[2] &= 0xFE  # Header selalu di LSB Biru
+        assert np.array_equal(cover & keep, stego & keep), (bits_per_channel, channels)
+
+
+def test_mode_byte_round_trip():
+    """Byte mode header dapat dibaca kembali untuk setiap kombinasi yang didukung."""
+    for bits_per_channel in range(1, MAX_BITS_PER_CHANNEL + 1):
+        for channels in ALL_CHANNELS:
+            mode_byte = _lsb_mode_byte(bits_per_channel, channels)
+            expected = (bits_per_channel, tuple(sorted('RGB'.index(ch) for ch in channels)))
+            assert _parse_lsb_mode_byte(mode_byte) == expected
+    assert _lsb_mode_byte(1, ('B',)) == 0
+
+
+def test_embed_extract_all_modes():
+    """Embed lalu extract menghasilkan QR yang identik di setiap mode."""
+    for bits_per_channel in range(1, MAX_BITS_PER_CHANNEL + 1):
+        for channels in ALL_CHANNELS:
+            _round_trip(bits_per_channel, channels)
+
+
+def test_multibit_capacity():
+    """QR yang melebihi kapasitas mode lama muat tanpa resize di mode 4 bit RGB."""
+    _round_trip(MAX_BITS_PER_CHANNEL, ('R', 'G', 'B'), qr_size=(100, 100))
+
+
+def test_default_embed_writes_legacy_header():
+    """Tanpa argumen mode, header tetap berformat lama (byte mode 0)."""
+    with tempfile.TemporaryDirectory() as workdir:
+        cover_path, qr_path, _ = _make_images(workdir)
+        stego_path = os.path.join(workdir, 'stego.png')
+        embed_qr_to_image(cover_path, qr_path, stego_path, verbose=False)
+        blue = np.asarray(Image.open(stego_path))[..., 2].reshape(-1)
+        header = np.packbits(blue[:40] & 1).tobytes()
+        assert struct.unpack('>HHB', header) == (QR_SIZE[0], QR_SIZE[1], 0)
+
+
+def test_extract_baseline_stego():
+    """Stego image format lama (ditulis manual: header + bit QR di LSB Biru) tetap bisa diekstrak."""
+    with tempfile.TemporaryDirectory() as workdir:
+        cover_path, _, qr_black = _make_images(workdir)
+        header = np.unpackbits(np.frombuffer(struct.pack('>HHB', QR_SIZE[0], QR_SIZE[1], 0), dtype=np.uint8))
+        bits = np.concatenate([header, qr_black.reshape(-1).astype(np.uint8)])
+
+        stego = np.array(Image.open(cover_path))
+        blue = stego.reshape(-1, 3)[:, 2]  # View: menulis blue mengubah stego
+        blue[:bits.size] = (blue[:bits.size] & 0xFE) | bits
+        stego_path = os.path.join(workdir, 'baseline_stego.png')
+        Image.fromarray(stego, 'RGB').save(stego_path)
+
+        extracted_path = os.path.join(workdir, 'extracted.png')
+        extract_qr_from_image(stego_path, extracted_path, verbose=False)
+        assert np.array_equal(_extracted_black(extracted_path), qr_black)
+
+
+if __name__ == "__main__":
+    for test in (test_mode_byte_round_trip, test_embed_extract_all_modes, test_multibit_capacity,
+                 test_default_embed_writes_legacy_header, test_extract_baseline_stego):
+        test()
+        print(f"✓ {test.__name__}")